@@ -1,52 +1,43 @@
-import requests
+import argparse
+import logging
+import os
 import pandas as pd
-
-# URL containing the cricket data
-url = ("https://stats.espncricinfo.com/ci/engine/stats/index.html?"
-       "class=2;home_or_away=1;home_or_away=2;home_or_away=3;"
-       "spanmin1=1+Jan+2020;spanval1=span;team=6;template=results;type=batting")
-
-# Define headers to mimic a web browser
-headers = {
-    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                   "AppleWebKit/537.36 (KHTML, like Gecko) "
-                   "Chrome/115.0 Safari/537.36")
-}
-
-# Fetch the webpage using the custom headers
-response = requests.get(url, headers=headers)
-
-# Check if the response status is OK (200)
-try:
-    response.raise_for_status()
-except requests.exceptions.HTTPError as e:
-    print(f"HTTP error occurred: {e}")
-    exit(1)
-
-# Optionally, you can check the status code
-if response.status_code != 200:
-    print(f"Unexpected status code: {response.status_code}")
+from cricinfo_crawler import BASE_URL, FORMATS, STAT_TYPES, TEAMS, all_queries, crawl, upsert_rows
+
+# Command line options: which teams/formats/stat types to fetch, and how hard
+# to hit the server. The defaults reproduce the original single query
+# (India, ODI, batting since 2020).
+parser = argparse.ArgumentParser(description="Scrape Statsguru results into a CSV.")
+parser.add_argument("--teams", type=int, nargs="+", default=[6],
+                    help=f"Team ids, or 0 for all of {sorted(TEAMS)}")
+parser.add_argument("--formats", type=int, nargs="+", default=[2],
+                    help="1 = Test, 2 = ODI, 3 = T20I")
+parser.add_argument("--types", nargs="+", default=["batting"], choices=STAT_TYPES)
+parser.add_argument("--workers", type=int, default=8, help="Concurrent requests")
+parser.add_argument("--rate", type=float, default=4.0, help="Max requests per second per host")
+parser.add_argument("--cache-dir", default="scrape_cache",
+                    help="HTTP/page cache; also lets an interrupted run resume")
+parser.add_argument("--base-url", default=BASE_URL, help="Override to crawl a local fixture server")
+parser.add_argument("--output", default="cricket_data.csv")
+args = parser.parse_args()
+logging.basicConfig(format="%(levelname)s: %(message)s")
+
+teams = list(TEAMS) if args.teams == [0] else args.teams
+queries = all_queries(teams=teams, formats=[f for f in args.formats if f in FORMATS], stat_types=args.types)
+print(f"Fetching {len(queries)} queries with {args.workers} workers...")
+
+updates, summary = crawl(queries, args.cache_dir, base_url=args.base_url,
+                         workers=args.workers, rate=args.rate)
+print(", ".join(f"{count} {outcome.replace('_', ' ')}" for outcome, count in summary.items()) + " pages")
+
+# Merge new/changed rows into what we already have instead of overwriting it
+existing = pd.read_csv(args.output) if os.path.exists(args.output) else None
+df = upsert_rows(existing, updates)
+
+if df.empty:
+    print("No tables found. The page structure may have changed or the data may be loaded dynamically.")
     exit(1)
 
-# Use pandas to read all tables in the page
-try:
-    tables = pd.read_html(response.text)
-except ValueError as ve:
-    print("No tables found in the HTML. The page structure may have changed or the data may be loaded dynamically.")
-    exit(1)
-
-# Check if any tables were found
-if not tables:
-    print("No tables found on the page.")
-    exit(1)
-
-# For this example, assume the main data table is the first one
-df = tables[0]
-
-# Optionally, print out the first few rows to verify the data
-print(df.head())
-
 # Save the DataFrame to a CSV file
-csv_filename = "cricket_data.csv"
-df.to_csv(csv_filename, index=False)
-print(f"Data has been saved to '{csv_filename}'")
+df.to_csv(args.output, index=False)
+print(f"{len(updates)} rows updated, {len(df)} rows saved to '{args.output}'")
@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+
+# ------------------------------------------------------------------------------
+# Answer cache
+# ------------------------------------------------------------------------------
+# Chat answers keyed on the parsed Intent rather than the raw question, so
+# "Top 5 batsmen", "show me the top 5 batsmen!" and "TOP 5 BATSMEN" share one
+# entry. It is one LRU per process, shared by every session and API request.
+# Entries expire after a TTL. Each key carries the versions of the data the
+# answer came from (stats file hash, deliveries store, form engine), so the
+# first lookup after the data changes sees a new version and drops the stale
+# entries.
+
+MAX_ENTRIES = 1024
+TTL_SECONDS = 600
+
+def normalize_intent(intent):
+    """The intent with player names lower-cased and whitespace collapsed."""
+    players = tuple(" ".join(name.lower().split()) for name in intent.players)
+    stat = intent.stat.lower() if intent.stat else intent.stat
+    if players == intent.players and stat == intent.stat:
+        return intent
+    return replace(intent, players=players, stat=stat)
+
+class AnswerCache:
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.version = None
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0, 'invalidated': 0}
+
+    def get_or_compute(self, version, intent, compute):
+        """The cached answer for intent at this data version, computing and storing it on a miss."""
+        key = normalize_intent(intent)
+        now = time.monotonic()
+        with self.lock:
+            if version != self.version:
+                self.stats['invalidated'] += len(self.entries)
+                self.entries.clear()
+                self.version = version
+            entry = self.entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self.entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry[1]
+                del self.entries[key]
+                self.stats['expired'] += 1
+            self.stats['misses'] += 1
+        # Computed outside the lock; two sessions missing on the same key at
+        # once both compute it, which is cheaper than serializing all answers.
+        answer = compute()
+        with self.lock:
+            if version == self.version:
+                self.entries[key] = (now, answer)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                    self.stats['evicted'] += 1
+        return answer
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def metrics(self):
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return dict(self.stats, entries=len(self.entries), max_entries=self.max_entries,
+                        ttl_seconds=self.ttl, hit_rate=round(self.stats['hits'] / lookups, 3) if lookups else None)
+
+answer_cache = AnswerCache()
@@ -0,0 +1,167 @@
+import json
+import time
+from collections import defaultdict
+from dataclasses import asdict
+from chatbot_engine import DATA_FILE, get_engine
+from data_loader import display_stat
+from intent_router import parse_intent
+from player_index import disambiguation_prompt, resolve_player
+
+# ------------------------------------------------------------------------------
+# Batch question answering
+# ------------------------------------------------------------------------------
+# Answers a file of questions (one per line, or JSONL with a "question" field)
+# and writes one JSONL result per question, in input order, with the same text
+# the chatbot would give. Questions are parsed first, then grouped by intent:
+#   - single-player lookups (stat, health) resolve every name once and gather
+#     each stat column for the whole group in one indexing operation
+#   - everything else is answered once per distinct intent; a report asking
+#     "top 5 batsmen" a thousand times does the work once
+# Each result carries its parse time and its share of the group's answer time.
+#
+# Usage: python batch_answer.py questions.txt [-o answers.jsonl] [--check previous.jsonl]
+
+def read_questions(path):
+    questions = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('{'):
+                line = json.loads(line)['question']
+            questions.append(line)
+    return questions
+
+def _lookup_group(engine, items, matches, column_for):
+    """
+    Values for (index, intent) items whose answer is one stat of one player,
+    with matches[index] the row position the player's name resolved to.
+    """
+    df = engine.df
+    positions = [matches[i] for i, _ in items]
+    by_column = defaultdict(list)
+    for (i, intent), pos in zip(items, positions):
+        column = column_for(intent)
+        if pos is not None and column in df.columns:
+            by_column[column].append((i, pos))
+    values = {}
+    for column, hits in by_column.items():
+        gathered = df[column].to_numpy()[[pos for _, pos in hits]]
+        values.update((i, value) for (i, _), value in zip(hits, gathered))
+    return values, positions
+
+def _answer_stats(engine, items, matches):
+    values, positions = _lookup_group(engine, items, matches, lambda intent: intent.stat)
+    df = engine.df
+    not_out = df['hs_not_out'].to_numpy() if 'hs_not_out' in df.columns else None
+    texts = []
+    for (i, intent), pos in zip(items, positions):
+        name, stat = intent.players[0], intent.stat
+        if pos is None:
+            result = f"Player '{name}' not found."
+        elif i not in values:
+            result = f"Stat '{stat}' not found."
+        else:
+            result = display_stat(stat, values[i], not_out is not None and not_out[pos])
+        texts.append(f"{name}'s {stat}: {result}")
+    return texts
+
+def _answer_health(engine, items, matches):
+    values, _ = _lookup_group(engine, items, matches, lambda intent: 'health_status')
+    texts = []
+    for i, intent in items:
+        name = intent.players[0]
+        if i not in values or values[i] == "Unknown":
+            texts.append(f"Player '{name}' not found or health status unavailable.")
+        else:
+            texts.append(f"{name}'s current Health Status: {values[i]}")
+    return texts
+
+_GROUP_ANSWERS = {'stat': _answer_stats, 'health': _answer_health}
+
+def answer_batch(engine, questions):
+    """One result dict per question, in order."""
+    results = []
+    groups = defaultdict(list)
+    for i, question in enumerate(questions):
+        start = time.perf_counter()
+        intent = parse_intent(question)
+        parse_ms = (time.perf_counter() - start) * 1000
+        results.append({'question': question,
+                        'intent': {k: v for k, v in asdict(intent).items() if v not in (None, ())},
+                        'parse_ms': round(parse_ms, 4)})
+        groups[intent.type].append((i, intent))
+
+    for intent_type, items in groups.items():
+        start = time.perf_counter()
+        if intent_type in _GROUP_ANSWERS:
+            # One resolution per name serves both the clarification check and the lookup
+            resolutions = {i: resolve_player(engine.player_index, intent.players[0]) for i, intent in items}
+            prompts = {i: disambiguation_prompt(resolutions[i], engine.df['player']) for i, _ in items}
+            clear = [(i, intent) for i, intent in items if not prompts[i]]
+            matches = {i: resolutions[i]['match'] for i, _ in clear}
+            answers = dict(zip((i for i, _ in clear), _GROUP_ANSWERS[intent_type](engine, clear, matches)))
+            texts = [prompts[i] or answers[i] for i, _ in items]
+        else:
+            answers = {}
+            texts = []
+            for _, intent in items:
+                if intent not in answers:
+                    answers[intent] = engine.answer_intent(intent)
+                texts.append(answers[intent])
+        share_ms = (time.perf_counter() - start) * 1000 / len(items)
+        for (i, _), text in zip(items, texts):
+            results[i]['text'] = text
+            results[i]['answer_ms'] = round(share_ms, 4)
+    return results
+
+def write_results(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        for result in results:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+def compare_results(results, previous_path):
+    """Questions whose intent or text differs from a previous run's output."""
+    with open(previous_path, encoding='utf-8') as f:
+        previous = {r['question']: r for r in map(json.loads, f)}
+    changed = []
+    for result in results:
+        old = previous.get(result['question'])
+        # Round-trip through JSON so tuples compare equal to the lists they were saved as
+        intent = json.loads(json.dumps(result['intent']))
+        if old is not None and (old['intent'] != intent or old['text'] != result['text']):
+            changed.append((old, result))
+    return changed
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Answer a file of chatbot questions in bulk.")
+    parser.add_argument("questions")
+    parser.add_argument("-o", "--output", default="answers.jsonl")
+    parser.add_argument("--data-file", default=DATA_FILE)
+    parser.add_argument("--check", help="Previous answers.jsonl to diff intents and answers against")
+    parser.add_argument("--compare", action="store_true",
+                        help="Also time answering the questions one at a time")
+    args = parser.parse_args()
+
+    engine = get_engine(args.data_file)
+    questions = read_questions(args.questions)
+    start = time.perf_counter()
+    results = answer_batch(engine, questions)
+    batch_seconds = time.perf_counter() - start
+    write_results(results, args.output)
+    print(f"{len(results)} answers written to '{args.output}' in {batch_seconds:.2f} s "
+          f"({len(results) / batch_seconds:.0f} questions/s)")
+    if args.compare:
+        start = time.perf_counter()
+        for question in questions:
+            engine.answer_question(question)
+        single_seconds = time.perf_counter() - start
+        print(f"One at a time: {single_seconds:.2f} s ({len(questions) / single_seconds:.0f} questions/s)")
+    if args.check:
+        changed = compare_results(results, args.check)
+        print(f"{len(changed)} answers differ from '{args.check}'")
+        for old, new in changed[:20]:
+            print(f"- {new['question']!r}: {old['text']!r} -> {new['text']!r}")
@@ -0,0 +1,105 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# ------------------------------------------------------------------------------
+# Chat history store
+# ------------------------------------------------------------------------------
+# Conversations are kept in a local SQLite file rather than in
+# st.session_state. The page reads only the last few turns, and older ones are
+# read a page at a time when asked for. Server memory stays flat however long a
+# session runs, and a signed-in user's conversation survives a server restart.
+# Messages older than RETENTION_DAYS are deleted when the store is opened, so
+# the file doesn't keep anonymous sessions nobody can reach any more.
+#
+# Connections are pooled and shared by every session's script thread. The
+# database runs in WAL mode, so readers don't wait on the writer.
+
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chat_history.sqlite3")
+POOL_SIZE = 4
+RETENTION_DAYS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    speaker TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id);
+CREATE INDEX IF NOT EXISTS messages_created ON messages (created);
+"""
+
+class ConnectionPool:
+    """A fixed set of SQLite connections handed out one thread at a time."""
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.connections = queue.Queue()
+        for _ in range(size):
+            conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.connections.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """A pooled connection, committed on success and rolled back on error."""
+        conn = self.connections.get()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self.connections.put(conn)
+
+class ChatHistory:
+    def __init__(self, path=HISTORY_FILE, pool_size=POOL_SIZE):
+        self.pool = ConnectionPool(path, pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(_SCHEMA)
+        self.prune(RETENTION_DAYS)
+
+    def prune(self, days):
+        """Deletes messages older than days."""
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM messages WHERE created < ?", (time.time() - days * 86400,))
+
+    def add_turn(self, session_id, question, answer):
+        """Stores a question and its answer together, so a page never shows half a turn."""
+        now = time.time()
+        with self.pool.connection() as conn:
+            conn.executemany(
+                "INSERT INTO messages (session_id, speaker, message, created) VALUES (?, ?, ?, ?)",
+                [(session_id, "You", question, now), (session_id, "Bot", answer, now)])
+
+    def recent(self, session_id, turns):
+        """The last `turns` turns of a session as (speaker, message) pairs, oldest first."""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT speaker, message FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (session_id, 2 * turns)).fetchall()
+        return rows[::-1]
+
+    def turn_count(self, session_id):
+        with self.pool.connection() as conn:
+            (messages,) = conn.execute("SELECT COUNT(*) FROM messages WHERE session_id = ?",
+                                       (session_id,)).fetchone()
+        return messages // 2
+
+    def clear(self, session_id):
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+
+_histories = {}
+_lock = threading.Lock()
+
+def get_chat_history(path=None):
+    """The process-wide ChatHistory for path (default HISTORY_FILE), opened on first use."""
+    path = path or HISTORY_FILE
+    with _lock:
+        if path not in _histories:
+            _histories[path] = ChatHistory(path)
+        return _histories[path]
@@ -0,0 +1,90 @@
+import os
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from answer_cache import answer_cache
+from chatbot_engine import DATA_FILE, get_engine
+from deliveries_store import STORE_FILE
+
+# ------------------------------------------------------------------------------
+# HTTP/JSON API for the chatbot engine
+# ------------------------------------------------------------------------------
+#   GET  /health    dataset version and row count
+#   GET  /metrics   answer cache hits, misses and size
+#   POST /ask       {"question": "..."}        -> one structured answer
+#   POST /ask_many  {"questions": ["...", ...]} -> {"answers": [...]}
+#
+# Answers are CPU-bound pandas/numpy work, so they run on the server's thread
+# pool and the event loop stays free to accept connections. Every worker
+# process loads the dataset once, through data_loader, and treats it as
+# read-only. Each process holds its own copy: the typed .feather file is read
+# through a memory map, but to_pandas() copies the columns into the process's
+# heap, so only the file read itself comes from the shared page cache.
+#
+# Run: python chatbot_api.py [--host 0.0.0.0] [--port 8000] [--workers 4]
+# Data files can be overridden with CHATBOT_DATA_FILE / CHATBOT_DELIVERIES_FILE.
+
+MAX_BATCH = 1000
+
+def _engine():
+    return get_engine(os.environ.get("CHATBOT_DATA_FILE", DATA_FILE),
+                      os.environ.get("CHATBOT_DELIVERIES_FILE", STORE_FILE))
+
+async def _json_body(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+async def health(request):
+    engine = await run_in_threadpool(_engine)
+    return JSONResponse({'status': 'ok', 'dataset_version': engine.version, 'players': len(engine.df),
+                         'ball_by_ball': engine.deliveries is not None})
+
+async def metrics(request):
+    return JSONResponse({'answer_cache': answer_cache.metrics()})
+
+async def ask(request):
+    body = await _json_body(request)
+    question = body.get('question') if isinstance(body, dict) else None
+    if not isinstance(question, str) or not question.strip():
+        return JSONResponse({'error': "Expected a JSON body like {\"question\": \"...\"}"}, status_code=400)
+    engine = await run_in_threadpool(_engine)
+    return JSONResponse(await run_in_threadpool(engine.ask, question))
+
+async def ask_many(request):
+    body = await _json_body(request)
+    questions = body.get('questions') if isinstance(body, dict) else None
+    if not isinstance(questions, list) or not all(isinstance(q, str) for q in questions):
+        return JSONResponse({'error': "Expected a JSON body like {\"questions\": [\"...\", ...]}"},
+                            status_code=400)
+    if len(questions) > MAX_BATCH:
+        return JSONResponse({'error': f"At most {MAX_BATCH} questions per request"}, status_code=413)
+    engine = await run_in_threadpool(_engine)
+    return JSONResponse({'answers': await run_in_threadpool(engine.ask_many, questions)})
+
+@asynccontextmanager
+async def lifespan(app):
+    # Load the data before the first request instead of during it
+    await run_in_threadpool(_engine)
+    yield
+
+app = Starlette(routes=[
+    Route("/health", health, methods=["GET"]),
+    Route("/metrics", metrics, methods=["GET"]),
+    Route("/ask", ask, methods=["POST"]),
+    Route("/ask_many", ask_many, methods=["POST"]),
+], lifespan=lifespan)
+
+if __name__ == '__main__':
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the cricket chatbot over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    uvicorn.run("chatbot_api:app", host=args.host, port=args.port, workers=args.workers)
@@ -0,0 +1,409 @@
+import os
+import threading
+import time
+from dataclasses import asdict
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+from data_loader import load_stats, cached_derived, dataset_version, display_value, display_stat, orderable
+from player_index import build_player_index, lookup_player, resolve_player, disambiguation_prompt
+from intent_router import parse_intent
+from leaderboard import get_leaderboards, top_positions, highest_position
+from playing_xi import load_config, get_playing_xis
+from clustering import get_cluster_table
+from similarity import get_similarity_index, similar_positions
+from deliveries_store import PHASES, STORE_FILE, get_store, batting_split, bowling_split
+from form import get_form_engine, form_scores
+from answer_cache import answer_cache
+
+# ------------------------------------------------------------------------------
+# Chatbot answering engine
+# ------------------------------------------------------------------------------
+# Everything needed to answer a question, without any UI: the Streamlit app
+# (iteration_4b.py), the HTTP API (chatbot_api.py) and batch runs all go
+# through a ChatbotEngine. An engine wraps the shared read-only frames and
+# lookup structures for one dataset version, so building one is cheap once
+# data_loader has the data cached, and one engine can serve many threads.
+
+DATA_FILE = "cricket_statsnew2.csv"
+
+# Stats included for each resolved player in structured answers
+PLAYER_FIELDS = ['player', 'mat', 'runs', 'ave', 'sr', 'wickets', 'economy', 'health_status']
+
+class ChatbotEngine:
+    def __init__(self, df, deliveries=None, deliveries_file=STORE_FILE, xi_config=None):
+        self.df = df
+        self.player_index = cached_derived(df, 'player_index', build_player_index)
+        self.leaderboards = get_leaderboards(df)
+        self.xi_config = xi_config or load_config()
+        self.playing_xis = get_playing_xis(df, self.xi_config)
+        self.cluster_table = get_cluster_table(df)
+        self.similarity_index = get_similarity_index(df)
+        # Ball-by-ball store for phase/venue/date splits; built by deliveries_store.py
+        self.deliveries_file = deliveries_file
+        self.deliveries = deliveries
+        self.form_engine = get_form_engine(deliveries)
+
+    @property
+    def version(self):
+        return dataset_version(self.df)
+
+    @property
+    def data_version(self):
+        """Versions of everything an answer can depend on, for the answer cache."""
+        return (self.version, self.deliveries['signature'] if self.deliveries else None, self.xi_config['hash'],
+                self.form_engine.version if self.form_engine else None)
+
+    def answer(self, intent):
+        """answer_intent through the shared answer cache."""
+        return answer_cache.get_or_compute(self.data_version, intent, lambda: self.answer_intent(intent))
+
+    # --------------------------------------------------------------------------
+    # Text answers
+    # --------------------------------------------------------------------------
+    def clarify_player(self, player_name, ball_by_ball=False):
+        """
+        A disambiguation question if player_name is ambiguous or only a near
+        miss ("pandya", "kholli"), else None.
+        """
+        if ball_by_ball:
+            if self.deliveries is None:
+                return None
+            index, names = self.deliveries['player_index'], self.deliveries['players']['player']
+        else:
+            index, names = self.player_index, self.df['player']
+        return disambiguation_prompt(resolve_player(index, player_name), names)
+
+    def find_player(self, player_name):
+        pos = lookup_player(self.player_index, player_name)
+        if pos is None:
+            return None
+        return self.df.iloc[pos]
+
+    def get_health_status(self, player_name):
+        player_row = self.find_player(player_name)
+        if player_row is not None:
+            return player_row['health_status']
+        return "Unknown"
+
+    def get_player_stat(self, player_name, stat):
+        player_row = self.find_player(player_name)
+        if player_row is not None:
+            if stat in self.df.columns:
+                return display_stat(stat, player_row[stat], player_row.get('hs_not_out', False))
+            else:
+                return f"Stat '{stat}' not found."
+        return f"Player '{player_name}' not found."
+
+    def get_highest_stat_player(self, stat, role=None):
+        if stat not in self.df.columns:
+            return f"Stat '{stat}' not found."
+        pos = highest_position(self.leaderboards, stat, role)
+        if pos is not None:
+            top_player = self.df.iloc[pos]
+            shown = display_stat(stat, top_player[stat], top_player.get('hs_not_out', False))
+            return (f"{top_player['player']} has the highest {stat}: {shown} "
+                    f"(Health: {top_player['health_status']})")
+        # Non-numeric stat: no precomputed ordering
+        if role == 'batsman':
+            filtered_df = self.df[self.df['runs'] > 100]
+        elif role == 'bowler':
+            filtered_df = self.df[self.df['wickets'] > 0]
+        else:
+            filtered_df = self.df
+        values = orderable(filtered_df[stat])
+        max_value = values.max()
+        top_player = filtered_df[values == max_value].iloc[0]
+        health_status = top_player['health_status']
+        return f"{top_player['player']} has the highest {stat}: {display_value(max_value)} (Health: {health_status})"
+
+    def get_best_allrounder(self):
+        # allrounder_rating is precomputed by features.add_features at load time
+        qualified = ((self.df['runs'] > 100) & (self.df['wickets'] > 10)).to_numpy()
+        ranked = top_positions(self.leaderboards, 'allrounder_rating', len(self.df))
+        ranked = ranked[qualified[ranked]]
+        if len(ranked) == 0:
+            return "No qualified all-rounders found."
+        best_allrounder = self.df.iloc[ranked[0]]
+        health_status = best_allrounder['health_status']
+        return (f"The best all-rounder is {best_allrounder['player']} "
+                f"with {best_allrounder['runs']} runs and {best_allrounder['wickets']} wickets "
+                f"(Health: {health_status})")
+
+    def compare_players(self, player1, player2, stat):
+        player1_row = self.find_player(player1)
+        player2_row = self.find_player(player2)
+        if player1_row is None or player2_row is None:
+            return "One or both players not found."
+        if stat not in self.df.columns:
+            return f"Stat '{stat}' not found."
+        player1_stat = display_stat(stat, player1_row[stat], player1_row.get('hs_not_out', False))
+        player2_stat = display_stat(stat, player2_row[stat], player2_row.get('hs_not_out', False))
+        return (f"{player1_row['player']}'s {stat}: {player1_stat}\n"
+                f"{player2_row['player']}'s {stat}: {player2_stat}")
+
+    def best_playing_xi(self, pitch_type):
+        pitch_type = pitch_type.lower()
+        if pitch_type not in self.playing_xis:
+            return "Pitch type not recognized. Please specify spin/fast/dew/slow."
+        response = f"Best Playing XI for a {pitch_type}-friendly pitch:\n"
+        for player, health_status in self.playing_xis[pitch_type]:
+            response += f"- {player} (Health: {health_status})\n"
+        return response.strip()
+
+    def top_n_players(self, role='batsman', n=5):
+        role = role.lower()
+        if role in ['batsman', 'batsmen', 'batter', 'batters']:
+            sorted_df = self.df.iloc[top_positions(self.leaderboards, 'runs', n)]
+            role_type = 'Batsman'
+        elif role in ['bowler', 'bowlers']:
+            sorted_df = self.df.iloc[top_positions(self.leaderboards, 'bowlers', n)]
+            role_type = 'Bowler'
+        else:
+            return f"Role '{role}' not recognized. Please specify either batsman or bowlers."
+        response = f"Top {n} {role_type}:\n"
+        for _, row in sorted_df.iterrows():
+            if role_type.lower() == 'batsman':
+                stat = f"{row['runs']} runs"
+            else:
+                stat = f"{row['wickets']} wickets at Economy {display_value(row['economy'])}"
+            response += f"- {row['player']} ({stat}, Health: {row['health_status']})\n"
+        return response.strip()
+
+    def most_fit_player(self):
+        fit_players = self.df[self.df['health_status'] == 'Fully Fit']
+        if fit_players.empty:
+            return "No fully fit players found."
+        # Rank by recent form when ball-by-ball data is loaded, career matches otherwise
+        form = form_scores(fit_players, self.form_engine)
+        if form.max() > 0:
+            top_fit_player = fit_players.loc[form.idxmax()]
+            return (f"The most fit player currently is {top_fit_player['player']} "
+                    f"(Form score: {form.max():.2f}, Matches Played: {top_fit_player['mat']}).")
+        top_fit_player = fit_players.sort_values(by='mat', ascending=False).iloc[0]
+        return (f"The most fit player currently is {top_fit_player['player']} "
+                f"(Matches Played: {top_fit_player['mat']}).")
+
+    def get_player_cluster(self, player_name):
+        pos = lookup_player(self.player_index, player_name)
+        if pos is None:
+            return f"Player '{player_name}' not found."
+        label = self.cluster_table['labels'][pos]
+        mates = [self.df['player'].iat[p] for p in self.cluster_table['members'][label] if p != pos]
+        response = (f"{self.df['player'].iat[pos]} is in cluster {label + 1} of {self.cluster_table['n_clusters']} "
+                    f"({len(mates) + 1} players)")
+        if mates:
+            response += f", alongside {', '.join(mates[:5])}"
+        return response + "."
+
+    def similar_tier_players(self, player_name, n=10):
+        pos = lookup_player(self.player_index, player_name)
+        if pos is None:
+            return f"Player '{player_name}' not found."
+        label = self.cluster_table['labels'][pos]
+        mates = [self.df['player'].iat[p] for p in self.cluster_table['members'][label] if p != pos]
+        if not mates:
+            return f"No other players share {self.df['player'].iat[pos]}'s tier."
+        return (f"Players in the same tier as {self.df['player'].iat[pos]}:\n"
+                + "\n".join(f"- {name}" for name in mates[:n]))
+
+    def similar_players(self, player_name, k=5):
+        pos = lookup_player(self.player_index, player_name)
+        if pos is None:
+            return f"Player '{player_name}' not found."
+        neighbours = similar_positions(self.similarity_index, pos, k)
+        if not neighbours:
+            return f"No comparable players found for {self.df['player'].iat[pos]}."
+        response = f"Players with the most similar profile to {self.df['player'].iat[pos]}:\n"
+        for p, distance in neighbours:
+            row = self.df.iloc[p]
+            response += (f"- {row['player']} (Ave {display_value(row['ave'])}, SR {display_value(row['sr'])}, "
+                         f"Economy {display_value(row['economy'])}, distance {distance:.2f})\n")
+        return response.strip()
+
+    def player_split(self, player_name, stat, overs=None, phase=None, since=None, home=None):
+        if self.deliveries is None:
+            return (f"Ball-by-ball data isn't available. Build '{self.deliveries_file}' with "
+                    "deliveries_store.py from a Cricsheet archive.")
+        code = lookup_player(self.deliveries['player_index'], player_name)
+        if code is None:
+            return f"Player '{player_name}' not found in the ball-by-ball data."
+        overs = overs or PHASES.get(phase)
+        if stat in ('economy', 'wickets'):
+            split = bowling_split(self.deliveries, code, overs=overs, since=since, home=home)
+            faced = f"{split['balls']} balls bowled"
+        else:
+            split = batting_split(self.deliveries, code, overs=overs, since=since, home=home)
+            faced = f"{split['balls']} balls faced"
+        filters = []
+        if overs:
+            filters.append(f"in overs {overs[0]}-{overs[1]}")
+        if home is not None:
+            filters.append("at home" if home else "away")
+        if since:
+            filters.append(f"since {since}")
+        name = self.deliveries['players']['player'].iat[code]
+        if split[stat] is None:
+            return f"Not enough data for {name}'s {stat} {' '.join(filters)}."
+        return f"{name}'s {stat} {' '.join(filters)}: {split[stat]} ({faced})"
+
+    def _form_line(self, name, row):
+        return (f"- {name}: {row['ewm_runs']:.1f} runs and {row['ewm_wickets']:.2f} wickets per innings (EWMA), "
+                f"last {self.form_engine.window} innings {row['recent_runs']} runs / {row['recent_wickets']} wickets, "
+                f"last 12 months {row['year_runs']} runs / {row['year_wickets']} wickets")
+
+    def player_form(self, player_name):
+        if self.form_engine is None:
+            return (f"Recent form needs ball-by-ball data. Build '{self.deliveries_file}' with "
+                    "deliveries_store.py from a Cricsheet archive.")
+        code = lookup_player(self.deliveries['player_index'], player_name)
+        if code is None:
+            return f"Player '{player_name}' not found in the ball-by-ball data."
+        name = self.deliveries['players']['player'].iat[code]
+        row = self.form_engine.player(name)
+        if row is None:
+            return f"No innings recorded for {name}."
+        return f"Recent form of {name} (form score {row['form_score']:.2f}):\n" + self._form_line(name, row)[2:]
+
+    def in_form_players(self, n=5):
+        if self.form_engine is None:
+            return (f"Recent form needs ball-by-ball data. Build '{self.deliveries_file}' with "
+                    "deliveries_store.py from a Cricsheet archive.")
+        table = self.form_engine.table().nlargest(n, 'form_score')
+        return f"Top {len(table)} players by recent form:\n" + "\n".join(
+            self._form_line(name, row) for name, row in table.iterrows())
+
+    def answer_intent(self, intent):
+        # Ask which player was meant before answering about the wrong one
+        for player_name in intent.players:
+            prompt = self.clarify_player(player_name, ball_by_ball=intent.type in ('split', 'form'))
+            if prompt:
+                return prompt
+        # Health Status Query
+        if intent.type == 'health':
+            player_name = intent.players[0]
+            status = self.get_health_status(player_name)
+            if status == "Unknown":
+                return f"Player '{player_name}' not found or health status unavailable."
+            return f"{player_name}'s current Health Status: {status}"
+        # Specific Player Stat Query
+        if intent.type == 'stat':
+            player_name = intent.players[0]
+            result = self.get_player_stat(player_name, intent.stat)
+            return f"{player_name}'s {intent.stat}: {result}"
+        # Highest Stat Query for Batsmen / Bowlers
+        if intent.type == 'highest':
+            return self.get_highest_stat_player(intent.stat, role=intent.role)
+        # Best All-rounder Query
+        if intent.type == 'allrounder':
+            return self.get_best_allrounder()
+        # Player Comparison Query
+        if intent.type == 'compare':
+            player1, player2 = intent.players
+            return self.compare_players(player1, player2, intent.stat)
+        # Best Playing XI Query
+        if intent.type == 'xi':
+            return self.best_playing_xi(intent.pitch)
+        # Top N Players Query
+        if intent.type == 'top_n':
+            return self.top_n_players(role=intent.role, n=intent.n)
+        # Most Fit Player Query
+        if intent.type == 'most_fit':
+            return self.most_fit_player()
+        # Player Cluster / Tier Queries
+        if intent.type == 'cluster':
+            return self.get_player_cluster(intent.players[0])
+        if intent.type == 'similar_tier':
+            return self.similar_tier_players(intent.players[0])
+        # Similar Players Query
+        if intent.type == 'similar':
+            return self.similar_players(intent.players[0])
+        # Recent Form Queries
+        if intent.type == 'form':
+            return self.player_form(intent.players[0]) if intent.players else self.in_form_players()
+        # Ball-by-ball Split Query (phase, home/away, since year)
+        if intent.type == 'split':
+            return self.player_split(intent.players[0], intent.stat, overs=intent.overs, phase=intent.phase,
+                                     since=intent.since, home=intent.home)
+        return "Sorry! I couldn't understand your query."
+
+    def answer_question(self, question):
+        return self.answer_intent(parse_intent(question))
+
+    # --------------------------------------------------------------------------
+    # Chart data
+    # --------------------------------------------------------------------------
+    def player_stats_frame(self, players, stats):
+        """
+        A 'Player' column (the names as given) plus one float64 column per stat,
+        for charting. All players are resolved first, then every numeric stat is
+        gathered in one iloc. Unknown players and non-numeric stats are NaN.
+        """
+        players = list(players)
+        positions = [lookup_player(self.player_index, name) for name in players]
+        found = np.array([pos is not None for pos in positions], dtype=bool)
+        rows = np.array([pos for pos in positions if pos is not None], dtype='int64')
+        columns = {'Player': players}
+        for stat in dict.fromkeys(stats):
+            values = np.full(len(players), np.nan)
+            if stat in self.df.columns and is_numeric_dtype(self.df[stat]) and len(rows):
+                values[found] = self.df[stat].to_numpy(dtype='float64', na_value=np.nan)[rows].round(2)
+            columns[stat] = values
+        return pd.DataFrame(columns)
+
+    # --------------------------------------------------------------------------
+    # Structured answers
+    # --------------------------------------------------------------------------
+    def player_record(self, player_name):
+        """The PLAYER_FIELDS of a player as plain JSON-friendly values, or None."""
+        player_row = self.find_player(player_name)
+        if player_row is None:
+            return None
+        record = {}
+        for field in PLAYER_FIELDS:
+            if pd.isna(player_row[field]):
+                record[field] = None
+                continue
+            value = display_value(player_row[field])
+            if hasattr(value, 'item'):
+                value = value.item()
+            record[field] = value
+        return record
+
+    def ask(self, question):
+        """Intent, resolved players, text answer and timing for one question."""
+        start = time.perf_counter()
+        intent = parse_intent(question)
+        text = self.answer(intent)
+        return {
+            'question': question,
+            'intent': {key: value for key, value in asdict(intent).items() if value not in (None, ())},
+            'players': [self.player_record(name) for name in intent.players],
+            'text': text,
+            'dataset_version': self.version,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 3),
+        }
+
+    def ask_many(self, questions):
+        return [self.ask(question) for question in questions]
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_engine(data_file=DATA_FILE, deliveries_file=STORE_FILE):
+    """
+    The engine for the current contents of data_file (and deliveries_file, if
+    built) and of playing_xi_config.json, reused until any of them changes.
+    """
+    df = load_stats(data_file)
+    deliveries = get_store(deliveries_file)
+    # Re-read on every call so config edits apply without a restart; the
+    # XIs themselves are cached per config hash
+    xi_config = load_config()
+    key = (os.path.abspath(data_file), os.path.abspath(deliveries_file))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if (engine is None or engine.df is not df or engine.deliveries is not deliveries
+                or engine.xi_config['hash'] != xi_config['hash']):
+            engine = _engines[key] = ChatbotEngine(df, deliveries, deliveries_file, xi_config)
+        return engine
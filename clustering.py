@@ -0,0 +1,129 @@
+import os
+import tempfile
+import joblib
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import PCA
+from sklearn.preprocessing import StandardScaler
+from data_loader import cached_derived, dataset_version
+
+# ------------------------------------------------------------------------------
+# Player clustering
+# ------------------------------------------------------------------------------
+# The scaler, k-means centroids and PCA projection are fitted once and saved to
+# disk. After that, players are only ever assigned with a single predict():
+#   - on startup the saved model is loaded, not refitted
+#   - rows for players the model hasn't seen are folded in with a mini-batch
+#     partial_fit of the centroids (scaler and PCA stay fixed so existing
+#     assignments keep their meaning)
+#   - labels for a whole dataset are computed once per dataset version, so a
+#     chatbot lookup is a dict/array access
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+N_CLUSTERS = 4
+
+# Feature columns per schema: the notebook's test.csv, and the app's stats files
+# (which have no bowling strike rate, so wickets stands in for it). Each schema
+# gets its own saved model.
+FEATURE_SETS = {
+    'notebook': ['Batting_Average', 'Strike_Rate', 'Boundary_Percentage', 'Economy', 'Bowling_Strike_Rate'],
+    'stats': ['ave', 'sr', 'boundary_percentage', 'economy', 'wickets'],
+}
+
+def cluster_schema(df):
+    for schema, features in FEATURE_SETS.items():
+        if all(col in df.columns for col in features):
+            return schema
+    raise ValueError("Data has none of the clustering feature sets.")
+
+def cluster_features(df):
+    return FEATURE_SETS[cluster_schema(df)]
+
+def model_path(df):
+    """cluster_model.stats.joblib / cluster_model.notebook.joblib"""
+    return os.path.join(MODEL_DIR, f"cluster_model.{cluster_schema(df)}.joblib")
+
+def _matrix(df, features):
+    return np.nan_to_num(df[features].to_numpy(dtype='float64'))
+
+def _player_column(df):
+    return 'Player' if 'Player' in df.columns else 'player'
+
+def fit_clusters(df, n_clusters=N_CLUSTERS):
+    features = cluster_features(df)
+    X = _matrix(df, features)
+    scaler = StandardScaler().fit(X)
+    scaled = scaler.transform(X)
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=10).fit(scaled)
+    pca = PCA(n_components=2).fit(scaled)
+    return {
+        'features': features,
+        'scaler': scaler,
+        'kmeans': kmeans,
+        'pca': pca,
+        'players': set(df[_player_column(df)]),
+    }
+
+def save_model(model, path):
+    # Written to a temp file and renamed into place, so another process loading
+    # the model never sees a half-written file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".joblib.tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            joblib.dump(model, f)
+        # mkstemp creates the file owner-only
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+def load_model(path):
+    if not os.path.exists(path):
+        return None
+    return joblib.load(path)
+
+def assign_clusters(model, df):
+    """Cluster label per row of df."""
+    X = model['scaler'].transform(_matrix(df, model['features']))
+    return model['kmeans'].predict(X)
+
+def project(model, df):
+    """2-D PCA coordinates per row of df, in the fitted projection."""
+    return model['pca'].transform(model['scaler'].transform(_matrix(df, model['features'])))
+
+def update_clusters(model, new_rows):
+    """Folds new player rows into the centroids without refitting. Returns model."""
+    if len(new_rows) == 0:
+        return model
+    X = model['scaler'].transform(_matrix(new_rows, model['features']))
+    model['kmeans'].partial_fit(X)
+    model['players'].update(new_rows[_player_column(new_rows)])
+    return model
+
+def get_cluster_model(df, path=None):
+    """
+    The persisted model for df's schema: loaded from disk, fitted and saved on
+    first use, and updated with any players it hasn't seen yet.
+    """
+    path = path or model_path(df)
+    model = load_model(path)
+    if model is None or model['features'] != cluster_features(df):
+        model = fit_clusters(df)
+        save_model(model, path)
+        return model
+    unseen = df[~df[_player_column(df)].isin(model['players'])]
+    if len(unseen):
+        update_clusters(model, unseen)
+        save_model(model, path)
+    return model
+
+def build_cluster_table(df, model):
+    labels = assign_clusters(model, df)
+    members = {label: np.flatnonzero(labels == label) for label in np.unique(labels)}
+    return {'labels': labels, 'members': members, 'n_clusters': model['kmeans'].n_clusters,
+            'coords': project(model, df), 'version': dataset_version(df)}
+
+def get_cluster_table(df, path=None):
+    """Labels, members per cluster and PCA coordinates for df, computed once per dataset version."""
+    return cached_derived(df, 'clusters', lambda frame: build_cluster_table(frame, get_cluster_model(frame, path)))
@@ -0,0 +1,32 @@
+import os
+import sys
+import pandas as pd
+from data_loader import clean_stats, file_version, typed_path, write_typed, format_bytes
+
+# ------------------------------------------------------------------------------
+# One-off ingestion: stats CSV -> typed Feather file
+# ------------------------------------------------------------------------------
+# Usage: python convert_stats.py [file.csv ...]
+# Writes <name>.v<format>.feather next to each CSV, tagged with the CSV's content
+# hash. data_loader.load_stats picks the Feather file up automatically as long as
+# the CSV still has those contents, so re-run this after editing a CSV.
+
+DEFAULT_FILES = ["cricket_statsnew2.csv", "cricket_stats.csv"]
+
+def convert(csv_path):
+    raw = pd.read_csv(csv_path)
+    raw_bytes = raw.memory_usage(deep=True).sum()
+    df = clean_stats(raw)
+    out_path = typed_path(csv_path)
+    write_typed(df, out_path, file_version(csv_path))
+    print(f"{csv_path} -> {out_path}: {len(df)} rows, "
+          f"{format_bytes(raw_bytes)} as CSV frame, "
+          f"{format_bytes(df.memory_usage(deep=True).sum())} typed")
+    return out_path
+
+if __name__ == '__main__':
+    for csv_path in sys.argv[1:] or DEFAULT_FILES:
+        if not os.path.exists(csv_path):
+            print(f"File '{csv_path}' not found.")
+            continue
+        convert(csv_path)
@@ -0,0 +1,294 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from statsguru_table import extract_results_table
+
+# ------------------------------------------------------------------------------
+# Statsguru crawler
+# ------------------------------------------------------------------------------
+# Fetches every (team, format, batting/bowling) results query and all of its
+# pages concurrently over one pooled session. Requests to a host are spaced out
+# by a per-host rate limiter, and failed requests are retried with exponential
+# backoff.
+#
+# Every page goes through an on-disk cache keyed by URL (see PageCache):
+#   - requests are conditional (If-None-Match / If-Modified-Since), so an
+#     unchanged page costs a 304 and no parsing
+#   - a 200 whose body hashes the same as last time is not parsed either
+#   - a page checked during the current run is skipped, so a crawl that is
+#     interrupted picks up where it left off
+# crawl() returns only the rows of pages that changed during the run, including
+# those changed before an interruption; upsert_rows merges them into the
+# existing dataset.
+#
+# base_url can point at a local server serving saved pages, which is how the
+# crawler is exercised offline.
+
+BASE_URL = "https://stats.espncricinfo.com/ci/engine/stats/index.html"
+
+HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                   "AppleWebKit/537.36 (KHTML, like Gecko) "
+                   "Chrome/115.0 Safari/537.36")
+}
+
+TEAMS = {1: 'England', 2: 'Australia', 3: 'South Africa', 4: 'West Indies',
+         5: 'New Zealand', 6: 'India', 7: 'Pakistan', 8: 'Sri Lanka',
+         25: 'Bangladesh', 40: 'Afghanistan'}
+FORMATS = {1: 'Test', 2: 'ODI', 3: 'T20I'}
+STAT_TYPES = ['batting', 'bowling']
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+def build_url(team, match_class, stat_type, page=1, base_url=BASE_URL, span_start="1+Jan+2020"):
+    return (f"{base_url}?class={match_class};home_or_away=1;home_or_away=2;home_or_away=3;"
+            f"page={page};spanmin1={span_start};spanval1=span;team={team};"
+            f"template=results;type={stat_type}")
+
+def all_queries(teams=TEAMS, formats=FORMATS, stat_types=STAT_TYPES):
+    return [{'team': team, 'class': match_class, 'type': stat_type}
+            for team in teams for match_class in formats for stat_type in stat_types]
+
+class RateLimiter:
+    """Allows at most `rate` requests per second to each host."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = {}
+
+    def wait(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def make_session(pool_size):
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetch(session, limiter, url, retries=4, backoff=1.0, timeout=30, headers=None):
+    """GET url through the rate limiter, retrying connection errors and 429/5xx."""
+    for attempt in range(retries + 1):
+        limiter.wait(url)
+        try:
+            response = session.get(url, timeout=timeout, headers=headers)
+            if response.status_code not in RETRY_STATUSES:
+                response.raise_for_status()
+                return response
+            error = requests.HTTPError(f"{response.status_code} for {url}", response=response)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        if attempt < retries:
+            time.sleep(backoff * 2 ** attempt)
+    raise error
+
+def page_count(html):
+    """Number of result pages, from Statsguru's "Page 1 of N" label."""
+    match = re.search(r"Page\s+\d+\s+of\s+(\d+)", html)
+    return int(match.group(1)) if match else 1
+
+def parse_page(html, stat_type=None):
+    """
+    The results table of a Statsguru page, or None if it has none. Raises
+    TableSchemaError if the table doesn't look like a stat_type results table.
+    """
+    return extract_results_table(html, stat_type)
+
+# ------------------------------------------------------------------------------
+# On-disk page cache
+# ------------------------------------------------------------------------------
+class PageCache:
+    """
+    Per-URL validators (ETag, Last-Modified), body hash, page count and the
+    parsed table (one CSV per page), indexed in cache.json. run.json holds the
+    start time of a crawl that hasn't finished yet.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "pages"), exist_ok=True)
+        self.index_file = os.path.join(directory, "cache.json")
+        self.run_file = os.path.join(directory, "run.json")
+        self.entries = self._read_json(self.index_file, {})
+
+    @staticmethod
+    def _read_json(path, default):
+        if not os.path.exists(path):
+            return default
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_json(self, path, data):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def begin_run(self):
+        """Start time of the current run; an unfinished previous run is resumed."""
+        run = self._read_json(self.run_file, None)
+        if run is None:
+            run = {'started': time.time()}
+            self._write_json(self.run_file, run)
+        return run['started']
+
+    def end_run(self):
+        if os.path.exists(self.run_file):
+            os.remove(self.run_file)
+
+    def get(self, url):
+        return self.entries.get(url)
+
+    def conditional_headers(self, url):
+        entry = self.entries.get(url) or {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def touch(self, url, response=None):
+        """Marks an unchanged page as checked in this run."""
+        with self.lock:
+            entry = self.entries[url]
+            entry['checked_at'] = time.time()
+            if response is not None:
+                entry['etag'] = response.headers.get('ETag', entry.get('etag'))
+                entry['last_modified'] = response.headers.get('Last-Modified', entry.get('last_modified'))
+            self._write_json(self.index_file, self.entries)
+
+    def record(self, url, query, page, pages, response, digest, table):
+        name = hashlib.sha1(url.encode()).hexdigest()[:16] + ".csv"
+        if table is not None:
+            table.to_csv(os.path.join(self.directory, "pages", name), index=False)
+        now = time.time()
+        with self.lock:
+            self.entries[url] = {
+                'query': query, 'page': page, 'pages': pages,
+                'file': name if table is not None else None,
+                'sha1': digest,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'checked_at': now,
+                'changed_at': now,
+            }
+            self._write_json(self.index_file, self.entries)
+
+    def changed_since(self, started):
+        """URLs whose content changed at or after started, e.g. earlier in a resumed run."""
+        with self.lock:
+            return [url for url, entry in self.entries.items() if entry.get('changed_at', 0) >= started]
+
+    def rows(self, urls):
+        """Rows of the cached tables for urls, with Team/Format/Type columns."""
+        frames = []
+        for url in urls:
+            entry = self.entries.get(url)
+            if not entry or not entry['file']:
+                continue
+            table = pd.read_csv(os.path.join(self.directory, "pages", entry['file']))
+            query = entry['query']
+            frames.append(table.assign(Team=TEAMS.get(query['team'], query['team']),
+                                       Format=FORMATS.get(query['class'], query['class']),
+                                       Type=query['type']))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+# ------------------------------------------------------------------------------
+# Crawl
+# ------------------------------------------------------------------------------
+def crawl(queries, cache_dir, base_url=BASE_URL, workers=8, rate=4.0, retries=4, backoff=1.0):
+    """
+    Checks every page of every query and returns the rows of the pages that are
+    new or changed since the last completed crawl, plus counts of what happened.
+    A resumed run also returns the pages changed before it was interrupted.
+    """
+    cache = PageCache(cache_dir)
+    run_started = cache.begin_run()
+    limiter = RateLimiter(rate)
+    session = make_session(workers)
+    summary = {'changed': 0, 'not_modified': 0, 'same_content': 0, 'resumed': 0, 'failed': 0}
+    summary_lock = threading.Lock()
+
+    def count(outcome):
+        with summary_lock:
+            summary[outcome] += 1
+
+    def crawl_page(query, page):
+        url = build_url(query['team'], query['class'], query['type'], page, base_url)
+        entry = cache.get(url)
+        if entry is not None and entry['checked_at'] >= run_started:
+            count('resumed')
+            return entry['pages']
+        response = fetch(session, limiter, url, retries, backoff,
+                         headers=cache.conditional_headers(url))
+        if response.status_code == 304 and entry is not None:
+            cache.touch(url, response)
+            count('not_modified')
+            return entry['pages']
+        digest = hashlib.sha1(response.content).hexdigest()
+        if entry is not None and entry['sha1'] == digest:
+            cache.touch(url, response)
+            count('same_content')
+            return entry['pages']
+        html = response.text
+        pages = page_count(html)
+        cache.record(url, query, page, pages, response, digest, parse_page(html, query['type']))
+        count('changed')
+        return pages
+
+    failures = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(crawl_page, query, 1): (query, 1) for query in queries}
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                query, page = pending.pop(future)
+                try:
+                    pages = future.result()
+                except Exception as e:
+                    failures.append((query, page, e))
+                    continue
+                if page == 1:
+                    for next_page in range(2, pages + 1):
+                        pending[pool.submit(crawl_page, query, next_page)] = (query, next_page)
+    session.close()
+    for query, page, error in failures:
+        logger.warning("Failed %s page %d: %s", query, page, error)
+    summary['failed'] = len(failures)
+    if not failures:
+        cache.end_run()
+    return cache.rows(cache.changed_since(run_started)), summary
+
+UPSERT_KEY = ['Player', 'Team', 'Format', 'Type']
+
+def upsert_rows(existing, updates, key=UPSERT_KEY):
+    """existing with rows from updates added, or replacing rows with the same key."""
+    if existing is None or existing.empty or not all(col in existing.columns for col in key):
+        return updates.reset_index(drop=True)
+    if updates.empty:
+        return existing
+    merged = pd.concat([existing, updates], ignore_index=True)
+    return merged.drop_duplicates(subset=key, keep='last').reset_index(drop=True)
@@ -0,0 +1,164 @@
+import json
+import os
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+# ------------------------------------------------------------------------------
+# Cricsheet ball-by-ball ingestion
+# ------------------------------------------------------------------------------
+# Reads match JSON files straight out of a Cricsheet archive (e.g.
+# odi_male_json.zip) without extracting it. Matches are parsed in a process
+# pool; every worker opens the zip once and reads the members it is handed,
+# and only a small per-player summary per match comes back to the parent.
+# The parent folds those into running totals, so memory grows with the number
+# of players, not the number of matches.
+#
+# The output has the same columns as cricket_statsnew2.csv. Cricsheet has no
+# fitness information, so Health_Status is "Unknown".
+#
+# Usage: python cricsheet_ingest.py odi_male_json.zip [--team India] [--since 2020]
+
+OUTPUT_COLUMNS = ['Player', 'Span', 'Mat', 'Inns', 'NO', 'Runs', 'HS', 'Ave', 'BF', 'SR',
+                  '100', '50', '0', '4s', '6s', 'Health_Status', 'Economy', 'Wickets', 'No_Balls']
+
+# Dismissals that don't count as a wicket for the bowler
+NON_BOWLER_DISMISSALS = {'run out', 'retired hurt', 'retired out', 'retired not out',
+                         'obstructing the field', 'handled the ball', 'timed out'}
+
+_zip = None
+
+def _open_zip(path):
+    global _zip
+    _zip = zipfile.ZipFile(path)
+
+def match_members(zip_path):
+    with zipfile.ZipFile(zip_path) as archive:
+        return [name for name in archive.namelist() if name.endswith('.json')]
+
+def summarize_match(match, team=None, since=None):
+    """
+    Per-player totals for one parsed Cricsheet match:
+    {player: (Counter of additive stats, [(score, not_out) per innings], year)}.
+    """
+    info = match.get('info', {})
+    year = int(info.get('dates', ['0'])[0][:4])
+    if since and year < since:
+        return {}
+    squads = info.get('players', {})
+    wanted = set(squads.get(team, [])) if team else {p for squad in squads.values() for p in squad}
+
+    totals = {player: Counter(mat=1) for player in wanted}
+    scores = {player: [] for player in wanted}
+
+    for innings in match.get('innings', []):
+        batted = {}
+        out = set()
+        for over in innings.get('overs', []):
+            for ball in over.get('deliveries', []):
+                batter, bowler = ball['batter'], ball['bowler']
+                runs = ball.get('runs', {})
+                extras = ball.get('extras', {})
+                batter_runs = runs.get('batter', 0)
+                for player in (batter, ball.get('non_striker')):
+                    batted.setdefault(player, 0)
+                if batter in wanted:
+                    batted[batter] += batter_runs
+                    stats = totals[batter]
+                    stats['runs'] += batter_runs
+                    if 'wides' not in extras:
+                        stats['bf'] += 1
+                    if not runs.get('non_boundary'):
+                        stats['4s'] += batter_runs == 4
+                        stats['6s'] += batter_runs == 6
+                if bowler in wanted:
+                    stats = totals[bowler]
+                    stats['conceded'] += batter_runs + extras.get('wides', 0) + extras.get('noballs', 0)
+                    if 'wides' not in extras and 'noballs' not in extras:
+                        stats['balls_bowled'] += 1
+                    stats['no_balls'] += 'noballs' in extras
+                for wicket in ball.get('wickets', []):
+                    out.add(wicket['player_out'])
+                    if bowler in wanted and wicket.get('kind') not in NON_BOWLER_DISMISSALS:
+                        totals[bowler]['wickets'] += 1
+        for player, score in batted.items():
+            if player not in wanted:
+                continue
+            stats = totals[player]
+            stats['inns'] += 1
+            not_out = player not in out
+            stats['no'] += not_out
+            stats['100'] += score >= 100
+            stats['50'] += 50 <= score < 100
+            stats['0'] += score == 0 and not not_out
+            scores[player].append((score, not_out))
+
+    return {player: (totals[player], scores[player], year) for player in wanted}
+
+def _summarize_member(args):
+    name, team, since = args
+    with _zip.open(name) as f:
+        match = json.load(f)
+    return summarize_match(match, team, since)
+
+def ingest_zip(zip_path, team=None, since=None, workers=None, chunksize=16):
+    """Aggregates every match in a Cricsheet zip into one row per player."""
+    members = match_members(zip_path)
+    totals, best, spans = {}, {}, {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_open_zip, initargs=(zip_path,)) as pool:
+        tasks = ((name, team, since) for name in members)
+        for summary in pool.map(_summarize_member, tasks, chunksize=chunksize):
+            for player, (stats, innings_scores, year) in summary.items():
+                totals.setdefault(player, Counter()).update(stats)
+                for score, not_out in innings_scores:
+                    if player not in best or (score, not_out) > best[player]:
+                        best[player] = (score, not_out)
+                first, last = spans.get(player, (year, year))
+                spans[player] = (min(first, year), max(last, year))
+    return to_stats_frame(totals, best, spans)
+
+def to_stats_frame(totals, best, spans):
+    rows = []
+    for player, stats in totals.items():
+        dismissals = stats['inns'] - stats['no']
+        hs, hs_not_out = best.get(player, (0, False))
+        overs = stats['balls_bowled'] / 6
+        rows.append({
+            'Player': player,
+            'Span': f"{spans[player][0]}-{spans[player][1]}",
+            'Mat': stats['mat'],
+            'Inns': stats['inns'],
+            'NO': stats['no'],
+            'Runs': stats['runs'],
+            'HS': f"{hs}*" if hs_not_out else str(hs),
+            'Ave': round(stats['runs'] / dismissals, 2) if dismissals else None,
+            'BF': stats['bf'],
+            'SR': round(stats['runs'] / stats['bf'] * 100, 2) if stats['bf'] else None,
+            '100': stats['100'],
+            '50': stats['50'],
+            '0': stats['0'],
+            '4s': stats['4s'],
+            '6s': stats['6s'],
+            'Health_Status': "Unknown",
+            'Economy': round(stats['conceded'] / overs, 2) if overs else None,
+            'Wickets': stats['wickets'],
+            'No_Balls': stats['no_balls'],
+        })
+    df = pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
+    return df.sort_values('Runs', ascending=False, kind='stable').reset_index(drop=True)
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Aggregate a Cricsheet JSON zip into per-player stats.")
+    parser.add_argument("zip_path")
+    parser.add_argument("--team", help="Only players from this team's XIs, e.g. India")
+    parser.add_argument("--since", type=int, help="Only matches from this year on")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default="cricsheet_stats.csv")
+    args = parser.parse_args()
+
+    df = ingest_zip(args.zip_path, team=args.team, since=args.since, workers=args.workers)
+    df.to_csv(args.output, index=False)
+    print(f"{len(df)} players saved to '{args.output}'")
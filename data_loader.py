@@ -0,0 +1,205 @@
+import hashlib
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+from features import add_features
+
+# ------------------------------------------------------------------------------
+# Shared dataset loading
+# ------------------------------------------------------------------------------
+# Streamlit re-executes the whole script on every widget interaction, for every
+# session. Loading through here parses and cleans each stats file once per
+# process and hands the same frame back until the file on disk changes.
+# Treat the returned frame as read-only: it is shared by every session.
+
+_lock = threading.Lock()
+_cache = {}
+
+# Column types for the cleaned (lower-cased) stats schema. Columns not listed
+# here are left as pandas parsed them.
+INT_COLUMNS = ['mat', 'inns', 'no', 'runs', 'bf', '100', '50', '0', '4s', '6s',
+               'wickets', 'no_balls']
+FLOAT_COLUMNS = ['ave', 'sr', 'economy']
+CATEGORY_COLUMNS = ['span', 'health_status']
+
+# Bump whenever clean_stats changes what it produces, so stale typed files
+# written by an older convert_stats.py are ignored instead of loaded.
+TYPED_FORMAT = 3
+
+def clean_stats(df):
+    df.columns = [col.lower() for col in df.columns]
+    df['player'] = df['player'].fillna("")
+    df = df.drop_duplicates(subset=['player']).reset_index(drop=True)
+    return add_features(typed_stats(df))
+
+def typed_stats(df):
+    """
+    Gives the stats columns real dtypes instead of whatever read_csv guessed:
+    'HS' values like "166*" become an int 'hs' plus a bool 'hs_not_out',
+    repeated labels become categoricals, and rates are stored as float32.
+    """
+    if 'hs' in df.columns:
+        hs = df['hs'].astype(str).str.strip()
+        df['hs_not_out'] = hs.str.endswith('*')
+        df['hs'] = pd.to_numeric(hs.str.rstrip('*'), errors='coerce')
+    for col in INT_COLUMNS + ['hs']:
+        if col in df.columns:
+            values = pd.to_numeric(df[col], errors='coerce')
+            # int32 rather than the smallest fit: wickets * 10 must not overflow.
+            # A column with blank cells stays float64 with NaN, as read_csv has
+            # it: nullable Int32 would put pd.NA into every comparison mask.
+            df[col] = values.astype('int32') if values.notna().all() else values.astype('float64')
+    for col in FLOAT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+def typed_path(path):
+    """cricket_statsnew2.csv -> cricket_statsnew2.v2.feather"""
+    return f"{os.path.splitext(path)[0]}.v{TYPED_FORMAT}.feather"
+
+# Schema metadata key holding the content hash of the CSV a typed file was
+# written from. Timestamps can't be trusted for this (cp -p, git checkout and
+# rsync -t keep or set mtimes), so the fast path is only taken on a hash match.
+SOURCE_VERSION_KEY = b'source_version'
+
+def write_typed(df, path, source_version):
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), SOURCE_VERSION_KEY: source_version.encode()}
+    feather.write_feather(table.replace_schema_metadata(metadata), path)
+
+def read_typed(path, source_version):
+    """The typed frame in path, or None if it wasn't written from the CSV contents source_version."""
+    # Memory-mapped Arrow read: columns are decoded from the page cache instead
+    # of parsed from text. to_pandas() still copies them into the process heap.
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    # Only the schema in the file footer is read for the check
+    with pa.memory_map(path) as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    if metadata.get(SOURCE_VERSION_KEY) != source_version.encode():
+        return None
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+def _file_signature(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+def file_version(path):
+    """Short content hash of path; the dataset_version of a stats file."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+def load_stats(path):
+    """
+    Returns the cleaned stats frame for path. Cheap on repeat calls: only an
+    os.stat() unless the file's mtime/size changed, and then only a re-hash
+    unless the contents changed too. If convert_stats.py has written a
+    .feather next to the CSV from its current contents, that is loaded instead.
+    """
+    path = os.path.abspath(path)
+    signature = _file_signature(path)
+    with _lock:
+        entry = _cache.get(path)
+        if entry is not None and entry['signature'] == signature:
+            return entry['df']
+        version = file_version(path)
+        if entry is not None and entry['version'] == version:
+            # Touched but not changed
+            entry['signature'] = signature
+            return entry['df']
+
+        start = time.perf_counter()
+        fast_path = typed_path(path)
+        df = read_typed(fast_path, version) if os.path.exists(fast_path) else None
+        if df is not None:
+            source = fast_path
+        else:
+            df = clean_stats(pd.read_csv(path))
+            source = path
+        df.attrs['dataset_version'] = version
+        _cache[path] = {
+            'df': df,
+            'signature': signature,
+            'version': version,
+            'derived': {},
+            'info': {
+                'path': path,
+                'source': source,
+                'version': version,
+                'rows': len(df),
+                'load_seconds': time.perf_counter() - start,
+                'memory_bytes': int(df.memory_usage(deep=True).sum()),
+                'loaded_at': time.time(),
+            },
+        }
+        return df
+
+def load_info(path):
+    """Load time, memory footprint and version of the cached frame for path."""
+    entry = _cache.get(os.path.abspath(path))
+    return dict(entry['info']) if entry else None
+
+def dataset_version(df):
+    return df.attrs.get('dataset_version')
+
+def cached_derived(df, name, builder):
+    """
+    Memoizes builder(df) alongside a frame returned by load_stats, so lookup
+    structures are built once per dataset version instead of once per rerun.
+    Frames that didn't come from load_stats are just passed to builder.
+    """
+    with _lock:
+        entry = next((e for e in _cache.values() if e['df'] is df), None)
+        if entry is None:
+            return builder(df)
+        if name not in entry['derived']:
+            entry['derived'][name] = builder(df)
+        return entry['derived'][name]
+
+def display_value(value):
+    """
+    Rounds a stat value for display. Rates are held as float32, which would
+    otherwise print as 2.9200000762939453 instead of 2.92. Blank cells show as N/A.
+    """
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return "N/A"
+    if isinstance(value, (float, np.floating)):
+        return round(float(value), 2)
+    return value
+
+def display_stat(stat, value, not_out=False):
+    """
+    display_value of one player's stat. typed_stats splits a not-out highest
+    score like "166*" into hs=166 and hs_not_out=True; the '*' goes back on here.
+    """
+    shown = display_value(value)
+    if stat == 'hs' and not_out and shown != "N/A":
+        return f"{shown}*"
+    return shown
+
+def orderable(values):
+    """
+    values in a form max() and comparisons accept. typed_stats stores span and
+    health_status as unordered categoricals, which are compared here by their
+    labels, as they were when read straight from the CSV.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.astype(values.cat.categories.dtype)
+    return values
+
+def format_bytes(n):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if n < 1024 or unit == "GB":
+            return f"{n:.1f} {unit}"
+        n /= 1024
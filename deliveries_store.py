@@ -0,0 +1,245 @@
+import json
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from cricsheet_ingest import NON_BOWLER_DISMISSALS, match_members
+from player_index import build_player_index
+
+# ------------------------------------------------------------------------------
+# Ball-by-ball deliveries store
+# ------------------------------------------------------------------------------
+# One row per delivery, stored as a Feather file. Players, teams, venues and
+# cities are dictionary-encoded, so each delivery row is a handful of small
+# integers. On load the file is read through a memory map (to_pandas() copies
+# the columns into the process heap), and one group-by index per
+# player role (batter, bowler, player_out) is built: the row order sorted by
+# that player's code, plus offsets. All deliveries for one player are then a
+# contiguous slice of that order. Phase, venue, home and year questions are
+# vectorized masks over the slice, not scans of every delivery.
+#
+# Build from a Cricsheet archive:
+#   python deliveries_store.py odi_male_json.zip [--output deliveries.feather]
+
+STORE_FILE = "deliveries.feather"
+
+# Over ranges (1-based, inclusive) for named phases of an ODI innings
+PHASES = {
+    'powerplay': (1, 10),
+    'middle': (11, 40),
+    'death': (41, 50),
+}
+
+# Cities treated as home grounds for the "at home" / "away" filters. Cricsheet
+# records the city but not the country, so this has to be spelled out; extend
+# it for other teams as needed.
+HOME_CITIES = {
+    'India': ['Ahmedabad', 'Bengaluru', 'Bangalore', 'Chennai', 'Cuttack', 'Delhi', 'Dharamsala',
+              'Guwahati', 'Hyderabad', 'Indore', 'Jaipur', 'Kanpur', 'Kolkata', 'Lucknow',
+              'Mohali', 'Chandigarh', 'Mumbai', 'Nagpur', 'Pune', 'Raipur', 'Rajkot', 'Ranchi',
+              'Thiruvananthapuram', 'Visakhapatnam', 'Vadodara'],
+    'Australia': ['Adelaide', 'Brisbane', 'Canberra', 'Hobart', 'Melbourne', 'Perth', 'Sydney',
+                  'Cairns', 'Townsville'],
+    'England': ['Birmingham', 'Bristol', 'Cardiff', 'Chester-le-Street', 'Leeds', 'London',
+                'Manchester', 'Nottingham', 'Southampton', 'Taunton'],
+}
+
+CATEGORY_COLUMNS = ['batter', 'bowler', 'player_out', 'batting_team', 'bowling_team', 'venue', 'city']
+
+# Integer columns and the narrowest type that holds their values. `over` needs
+# int16: overs are numbered per innings, and longer formats run past 127.
+NARROW_COLUMNS = {
+    'innings': 'int8', 'over': 'int16', 'batter_runs': 'int8', 'extras': 'int8',
+    'wides': 'int8', 'noballs': 'int8', 'bowler_wicket': 'int8', 'year': 'int16', 'match_id': 'int32',
+}
+
+# Values of the batting_home / bowling_home columns. Deliveries at a ground with
+# no recorded city are neither home nor away.
+AWAY, HOME, UNKNOWN = 0, 1, -1
+
+# ------------------------------------------------------------------------------
+# Build
+# ------------------------------------------------------------------------------
+_zip = None
+
+def _open_zip(path):
+    global _zip
+    _zip = zipfile.ZipFile(path)
+
+def match_deliveries(match):
+    """Column lists for every delivery of one parsed Cricsheet match."""
+    info = match.get('info', {})
+    teams = info.get('teams', [])
+    date = info.get('dates', [None])[0]
+    rows = {name: [] for name in ['innings', 'over', 'batter', 'bowler', 'player_out', 'batting_team',
+                                  'bowling_team', 'batter_runs', 'extras', 'wides', 'noballs',
+                                  'bowler_wicket']}
+    for number, innings in enumerate(match.get('innings', []), start=1):
+        batting_team = innings.get('team')
+        bowling_team = next((t for t in teams if t != batting_team), None)
+        for over in innings.get('overs', []):
+            for ball in over.get('deliveries', []):
+                extras = ball.get('extras', {})
+                wickets = ball.get('wickets', [])
+                rows['innings'].append(number)
+                rows['over'].append(over['over'] + 1)
+                rows['batter'].append(ball['batter'])
+                rows['bowler'].append(ball['bowler'])
+                rows['player_out'].append(wickets[0]['player_out'] if wickets else None)
+                rows['batting_team'].append(batting_team)
+                rows['bowling_team'].append(bowling_team)
+                rows['batter_runs'].append(ball.get('runs', {}).get('batter', 0))
+                rows['extras'].append(ball.get('runs', {}).get('extras', 0))
+                rows['wides'].append(extras.get('wides', 0))
+                rows['noballs'].append(extras.get('noballs', 0))
+                rows['bowler_wicket'].append(sum(w.get('kind') not in NON_BOWLER_DISMISSALS for w in wickets))
+    return {'date': date, 'venue': info.get('venue'), 'city': info.get('city'), 'rows': rows}
+
+def _member_deliveries(name):
+    with _zip.open(name) as f:
+        return match_deliveries(json.load(f))
+
+def build_store(zip_path, workers=None, chunksize=16):
+    """Deliveries frame for every match in a Cricsheet zip."""
+    frames = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_open_zip, initargs=(zip_path,)) as pool:
+        for match_id, match in enumerate(pool.map(_member_deliveries, match_members(zip_path),
+                                                   chunksize=chunksize)):
+            frame = pd.DataFrame(match['rows'])
+            frame['match_id'] = match_id
+            frame['date'] = match['date']
+            frame['venue'] = match['venue']
+            frame['city'] = match['city']
+            frames.append(frame)
+    df = pd.concat(frames, ignore_index=True)
+    return encode_store(df)
+
+def _narrow(values, dtype):
+    """values cast to dtype, raising ValueError rather than wrapping around if any don't fit."""
+    info = np.iinfo(dtype)
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        raise ValueError(f"Column '{values.name}' has values {values.min()}..{values.max()}, "
+                         f"outside the {dtype} range")
+    return values.astype(dtype)
+
+def encode_store(df):
+    df['date'] = pd.to_datetime(df['date'])
+    df['year'] = df['date'].dt.year
+    for col, dtype in NARROW_COLUMNS.items():
+        df[col] = _narrow(df[col], dtype)
+    df['legal'] = (df['wides'] == 0) & (df['noballs'] == 0)
+    home_pairs = [(team, city) for team, cities in HOME_CITIES.items() for city in cities]
+    no_city = df['city'].isna().to_numpy()
+    for side in ('batting', 'bowling'):
+        pairs = pd.MultiIndex.from_arrays([df[f'{side}_team'], df['city']])
+        df[f'{side}_home'] = np.where(no_city, UNKNOWN, np.where(pairs.isin(home_pairs), HOME, AWAY)).astype('int8')
+    # One shared dictionary for the three player columns keeps codes comparable
+    players = pd.Index(pd.unique(pd.concat([df['batter'], df['bowler'], df['player_out'].dropna()])))
+    for col in CATEGORY_COLUMNS:
+        categories = players if col in ('batter', 'bowler', 'player_out') else None
+        df[col] = pd.Categorical(df[col], categories=categories)
+    return df
+
+def write_store(df, path=STORE_FILE):
+    df.to_feather(path)
+
+# ------------------------------------------------------------------------------
+# Load and query
+# ------------------------------------------------------------------------------
+def _group_index(codes, n_groups):
+    order = np.argsort(codes, kind='stable')
+    offsets = np.searchsorted(codes[order], np.arange(n_groups + 1))
+    return order, offsets
+
+def load_store(path=STORE_FILE):
+    """Deliveries frame plus per-player group-by indexes and a name index."""
+    import pyarrow.feather as feather
+    st = os.stat(path)
+    df = feather.read_table(path, memory_map=True).to_pandas()
+    players = pd.DataFrame({'player': df['batter'].cat.categories})
+    store = {'df': df, 'players': players, 'player_index': build_player_index(players), 'indexes': {},
+             'path': os.path.abspath(path), 'signature': (st.st_mtime_ns, st.st_size)}
+    for col in ('batter', 'bowler', 'player_out'):
+        store['indexes'][col] = _group_index(df[col].cat.codes.to_numpy(), len(players))
+    return store
+
+_lock = threading.Lock()
+_cache = {}
+
+def get_store(path=STORE_FILE):
+    """
+    The loaded store for path, shared across reruns and sessions until the file
+    changes, or None if the store hasn't been built.
+    """
+    path = os.path.abspath(path)
+    if not os.path.exists(path):
+        return None
+    st = os.stat(path)
+    signature = (st.st_mtime_ns, st.st_size)
+    with _lock:
+        entry = _cache.get(path)
+        if entry is None or entry['signature'] != signature:
+            entry = _cache[path] = {'signature': signature, 'store': load_store(path)}
+        return entry['store']
+
+def player_rows(store, role, player_code):
+    """Row positions of every delivery where the player was in `role`."""
+    order, offsets = store['indexes'][role]
+    return order[offsets[player_code]:offsets[player_code + 1]]
+
+def _filter(store, rows, overs=None, since=None, home=None, venue=None, home_column=None):
+    df = store['df']
+    mask = np.ones(len(rows), dtype=bool)
+    if overs is not None:
+        over = df['over'].to_numpy()[rows]
+        mask &= (over >= overs[0]) & (over <= overs[1])
+    if since is not None:
+        mask &= df['year'].to_numpy()[rows] >= since
+    if home is not None:
+        # Unknown-city deliveries match neither home=True nor home=False
+        mask &= df[home_column].to_numpy()[rows] == (HOME if home else AWAY)
+    if venue is not None:
+        venues = df['venue'].cat.categories
+        code = venues.get_loc(venue) if venue in venues else -1
+        mask &= df['venue'].cat.codes.to_numpy()[rows] == code
+    return rows[mask]
+
+def bowling_split(store, player_code, overs=None, since=None, home=None, venue=None):
+    """Balls, runs conceded, wickets and economy for a bowler's filtered deliveries."""
+    df = store['df']
+    rows = _filter(store, player_rows(store, 'bowler', player_code), overs, since, home, venue, 'bowling_home')
+    conceded = int((df['batter_runs'].to_numpy()[rows].astype('int64')
+                    + df['wides'].to_numpy()[rows] + df['noballs'].to_numpy()[rows]).sum())
+    balls = int(df['legal'].to_numpy()[rows].sum())
+    wickets = int(df['bowler_wicket'].to_numpy()[rows].sum())
+    return {'balls': balls, 'runs': conceded, 'wickets': wickets,
+            'economy': round(conceded / balls * 6, 2) if balls else None}
+
+def batting_split(store, player_code, overs=None, since=None, home=None, venue=None):
+    """Runs, balls faced, dismissals, strike rate and average for a batter's filtered deliveries."""
+    df = store['df']
+    rows = _filter(store, player_rows(store, 'batter', player_code), overs, since, home, venue, 'batting_home')
+    runs = int(df['batter_runs'].to_numpy()[rows].astype('int64').sum())
+    balls = int((df['wides'].to_numpy()[rows] == 0).sum())
+    out_rows = _filter(store, player_rows(store, 'player_out', player_code), overs, since, home, venue,
+                       'batting_home')
+    outs = len(out_rows)
+    return {'runs': runs, 'balls': balls, 'outs': outs,
+            'sr': round(runs / balls * 100, 2) if balls else None,
+            'ave': round(runs / outs, 2) if outs else None}
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the deliveries store from a Cricsheet JSON zip.")
+    parser.add_argument("zip_path")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default=STORE_FILE)
+    args = parser.parse_args()
+
+    df = build_store(args.zip_path, workers=args.workers)
+    write_store(df, args.output)
+    print(f"{len(df)} deliveries from {df['match_id'].nunique()} matches saved to '{args.output}' "
+          f"({df.memory_usage(deep=True).sum() / 1e6:.1f} MB in memory)")
@@ -0,0 +1,66 @@
+import numpy as np
+
+# ------------------------------------------------------------------------------
+# Derived player metrics
+# ------------------------------------------------------------------------------
+# Computed once per dataset, as whole-column NumPy operations, and stored as
+# columns so the chatbot, the explorer, the XI selector and the clustering all
+# read the same numbers. Works on both the app's stats schema (lower-case
+# 'ave', 'sr', 'bf', ...) and the notebook's test.csv schema ('Batting_Average',
+# 'Strike_Rate', 'Balls_Faced', ...); new column names follow the frame's
+# style ('batting_score' vs 'Batting_Score').
+#
+# Players with no balls faced, no overs or no economy get 0 instead of inf/NaN.
+
+COLUMN_ALIASES = {
+    'ave': ['ave', 'Batting_Average'],
+    'sr': ['sr', 'Strike_Rate'],
+    'balls': ['bf', 'Balls_Faced'],
+    'fours': ['4s'],
+    'sixes': ['6s'],
+    'wickets': ['wickets', 'Wickets'],
+    'overs': ['overs', 'Overs'],
+    'economy': ['economy', 'Economy'],
+}
+
+FEATURES = ['Boundary_Percentage', 'Batting_Score', 'Bowling_Score', 'Allrounder_Rating']
+
+def _column(df, name):
+    for col in COLUMN_ALIASES[name]:
+        if col in df.columns:
+            return df[col].to_numpy(dtype='float64', na_value=np.nan)
+    return None
+
+def safe_divide(numerator, denominator):
+    """numerator / denominator, with 0 wherever the denominator is 0 or missing."""
+    out = np.zeros(np.broadcast(numerator, denominator).shape)
+    ok = np.isfinite(denominator) & (denominator != 0)
+    np.divide(numerator, denominator, out=out, where=ok)
+    return np.nan_to_num(out, nan=0.0, posinf=0.0, neginf=0.0)
+
+def feature_name(df, name):
+    """'Batting_Score' -> 'batting_score' for frames with lower-case columns."""
+    return name if 'Player' in df.columns else name.lower()
+
+def add_features(df):
+    """Adds every metric in FEATURES that df has the inputs for. Returns df."""
+    ave, sr = _column(df, 'ave'), _column(df, 'sr')
+    balls, fours, sixes = _column(df, 'balls'), _column(df, 'fours'), _column(df, 'sixes')
+    wickets, overs, economy = _column(df, 'wickets'), _column(df, 'overs'), _column(df, 'economy')
+
+    new_columns = {}
+    if balls is not None and fours is not None and sixes is not None:
+        new_columns['Boundary_Percentage'] = safe_divide(fours + sixes, balls) * 100
+    if ave is not None and sr is not None:
+        new_columns['Batting_Score'] = np.nan_to_num(ave * sr / 100)
+    if wickets is not None and economy is not None:
+        # Wickets per over per run conceded; the stats CSVs have no overs
+        # column, so there it is just wickets per unit of economy.
+        per_over = safe_divide(wickets, overs) if overs is not None else wickets
+        new_columns['Bowling_Score'] = safe_divide(per_over, economy)
+    if ave is not None and sr is not None and wickets is not None:
+        new_columns['Allrounder_Rating'] = np.nan_to_num(ave * sr / 100 + wickets * 10)
+
+    for name, values in new_columns.items():
+        df[feature_name(df, name)] = values
+    return df
@@ -0,0 +1,87 @@
+import io
+import threading
+from collections import OrderedDict
+
+# ------------------------------------------------------------------------------
+# Rendered figure cache
+# ------------------------------------------------------------------------------
+# Charts are keyed by (chart type, players, stat, dataset version) and stored
+# already rendered: PNG bytes for matplotlib figures, Plotly's JSON for Plotly
+# figures. A rerun that shows the same chart again skips the data gathering and
+# the drawing. It is one LRU per process, shared by every session, and bounded
+# by total payload size as well as entry count. Entries for an old dataset
+# version are never hit again and age out of the LRU.
+#
+# Matplotlib figures are closed as soon as they are rendered to bytes, so
+# pyplot's figure registry doesn't keep every chart ever drawn alive.
+
+MAX_ENTRIES = 256
+MAX_BYTES = 64 * 1024 * 1024
+
+def figure_key(kind, players, stat, version):
+    """Cache key for one chart. players=None stands for the chart's default selection."""
+    return (kind, None if players is None else tuple(players), stat, version)
+
+def render_png(fig, dpi=200):
+    """PNG bytes of a matplotlib figure, as st.pyplot would draw it. The figure is closed afterwards."""
+    # Imported here so the Plotly-only app doesn't load matplotlib
+    import matplotlib.pyplot as plt
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+def plotly_figure(payload):
+    """A Plotly figure rebuilt from the JSON stored by the cache."""
+    import plotly.io as pio
+    return pio.from_json(payload, skip_invalid=True)
+
+class FigureCache:
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+
+    def get_or_render(self, key, render):
+        """
+        The cached payload (bytes or str) for key, calling render() on a miss.
+        render may return None when there is nothing to draw; that isn't cached.
+        """
+        with self.lock:
+            payload = self.entries.get(key)
+            if payload is not None:
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return payload
+            self.stats['misses'] += 1
+        payload = render()
+        if payload is None or len(payload) > self.max_bytes:
+            return payload
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = payload
+                self.total_bytes += len(payload)
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+                self.stats['evicted'] += 1
+        return payload
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def metrics(self):
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return dict(self.stats, entries=len(self.entries), max_entries=self.max_entries,
+                        bytes=self.total_bytes, max_bytes=self.max_bytes,
+                        hit_rate=round(self.stats['hits'] / lookups, 3) if lookups else None)
+
+figure_cache = FigureCache()
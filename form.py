@@ -0,0 +1,231 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------
+# Recent-form engine
+# ------------------------------------------------------------------------------
+# Rolling and exponentially weighted stats per player, from per-innings rows
+# (one row per player per match, built from the deliveries store). Every
+# player carries a small running state:
+#   - the last `window` innings in a deque, with running sums
+#   - the innings of the last `days` days in a second deque, with running sums
+#   - EWMA runs and wickets per innings
+# Appending an innings only updates that player's state, in O(1) amortized.
+# History is never replayed. The per-player table that the chatbot and the
+# XI selector read is rebuilt from those states only after something changed.
+
+INNINGS_COLUMNS = ['player', 'date', 'runs', 'balls', 'outs', 'conceded', 'balls_bowled', 'wickets']
+_SUMMED = INNINGS_COLUMNS[2:]
+
+def innings_from_deliveries(deliveries):
+    """Per-player per-match batting and bowling totals from a deliveries frame, in date order."""
+    d = deliveries
+    players = d['batter'].cat.categories
+    batting = pd.DataFrame({
+        'match_id': d['match_id'].to_numpy(),
+        'player': d['batter'].cat.codes.to_numpy(),
+        'runs': d['batter_runs'].to_numpy(dtype='int32'),
+        'balls': (d['wides'].to_numpy() == 0).astype('int32'),
+    }).groupby(['match_id', 'player'], sort=False).sum()
+    outs = pd.DataFrame({
+        'match_id': d['match_id'].to_numpy(),
+        'player': d['player_out'].cat.codes.to_numpy(),
+    })
+    outs = outs[outs['player'] >= 0].groupby(['match_id', 'player'], sort=False).size().rename('outs')
+    bowling = pd.DataFrame({
+        'match_id': d['match_id'].to_numpy(),
+        'player': d['bowler'].cat.codes.to_numpy(),
+        'conceded': (d['batter_runs'].to_numpy(dtype='int32') + d['wides'].to_numpy() + d['noballs'].to_numpy()),
+        'balls_bowled': d['legal'].to_numpy(dtype='int32'),
+        'wickets': d['bowler_wicket'].to_numpy(dtype='int32'),
+    }).groupby(['match_id', 'player'], sort=False).sum()
+    innings = batting.join(outs, how='outer').join(bowling, how='outer').fillna(0).astype('int32').reset_index()
+    dates = pd.Series(d['date'].to_numpy(), index=d['match_id'].to_numpy())
+    innings['date'] = innings['match_id'].map(dates[~dates.index.duplicated()])
+    innings['player'] = players[innings['player']]
+    return innings.sort_values(['date', 'match_id'], kind='stable')[INNINGS_COLUMNS].reset_index(drop=True)
+
+class _PlayerForm:
+    __slots__ = ('recent', 'recent_sums', 'dated', 'dated_sums', 'ewm_runs', 'ewm_wickets', 'innings', 'last_date')
+
+    def __init__(self, window):
+        self.recent = deque(maxlen=window)
+        self.recent_sums = np.zeros(len(_SUMMED), dtype='int64')
+        self.dated = deque()
+        self.dated_sums = np.zeros(len(_SUMMED), dtype='int64')
+        self.ewm_runs = None
+        self.ewm_wickets = None
+        self.innings = 0
+        self.last_date = None
+
+class FormEngine:
+    """Rolling (last `window` innings, last `days` days) and EWMA form per player."""
+
+    def __init__(self, window=10, days=365, alpha=0.3):
+        self.window = window
+        self.days = pd.Timedelta(days=days)
+        self.alpha = alpha
+        self.players = {}
+        self.as_of = None
+        self.version = 0
+        self._table = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_innings(cls, innings, **kwargs):
+        engine = cls(**kwargs)
+        engine.extend(innings)
+        return engine
+
+    def extend(self, innings):
+        """Appends innings rows (a frame with INNINGS_COLUMNS), oldest first."""
+        values = innings[_SUMMED].to_numpy(dtype='int64')
+        with self._lock:
+            for player, date, stats in zip(innings['player'], pd.to_datetime(innings['date']), values):
+                self._append(player, date, stats)
+            self._changed()
+
+    def append(self, player, date, runs=0, balls=0, outs=0, conceded=0, balls_bowled=0, wickets=0):
+        """Adds one innings for one player."""
+        stats = np.array([runs, balls, outs, conceded, balls_bowled, wickets], dtype='int64')
+        with self._lock:
+            self._append(player, pd.Timestamp(date), stats)
+            self._changed()
+
+    def _append(self, player, date, stats):
+        state = self.players.get(player)
+        if state is None:
+            state = self.players[player] = _PlayerForm(self.window)
+        if len(state.recent) == state.recent.maxlen:
+            state.recent_sums -= state.recent[0][1]
+        state.recent.append((date, stats))
+        state.recent_sums += stats
+        state.dated.append((date, stats))
+        state.dated_sums += stats
+        self._evict(state, date)
+        runs, wickets = stats[0], stats[5]
+        if state.ewm_runs is None:
+            state.ewm_runs, state.ewm_wickets = float(runs), float(wickets)
+        else:
+            state.ewm_runs += self.alpha * (runs - state.ewm_runs)
+            state.ewm_wickets += self.alpha * (wickets - state.ewm_wickets)
+        state.innings += 1
+        state.last_date = date
+        if self.as_of is None or date > self.as_of:
+            self.as_of = date
+
+    def _evict(self, state, as_of):
+        cutoff = as_of - self.days
+        while state.dated and state.dated[0][0] <= cutoff:
+            state.dated_sums -= state.dated.popleft()[1]
+
+    def _changed(self):
+        self.version += 1
+        self._table = None
+
+    def table(self):
+        """
+        One row per player: innings count, last-N and last-days totals and rates,
+        EWMA runs/wickets and a 0-1 form_score. Rebuilt only after an append.
+        """
+        with self._lock:
+            if self._table is not None:
+                return self._table
+            names = list(self.players)
+            recent = np.empty((len(names), len(_SUMMED)), dtype='int64')
+            dated = np.empty_like(recent)
+            ewm = np.empty((len(names), 2))
+            info = []
+            for i, name in enumerate(names):
+                state = self.players[name]
+                # Windows are relative to the newest innings in the engine
+                self._evict(state, self.as_of)
+                recent[i] = state.recent_sums
+                dated[i] = state.dated_sums
+                ewm[i] = (state.ewm_runs, state.ewm_wickets)
+                info.append((state.innings, state.last_date))
+            table = pd.DataFrame(info, index=pd.Index(names, name='player'), columns=['innings', 'last_played'])
+            for prefix, sums in (('recent', recent), ('year', dated)):
+                runs, balls, outs, conceded, bowled, wickets = sums.T
+                table[f'{prefix}_runs'] = runs
+                table[f'{prefix}_wickets'] = wickets
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    table[f'{prefix}_ave'] = np.where(outs > 0, runs / outs, np.nan).round(2)
+                    table[f'{prefix}_sr'] = np.where(balls > 0, runs / balls * 100, np.nan).round(2)
+                    table[f'{prefix}_economy'] = np.where(bowled > 0, conceded / bowled * 6, np.nan).round(2)
+            table['ewm_runs'] = ewm[:, 0].round(2)
+            table['ewm_wickets'] = ewm[:, 1].round(2)
+            # Batting and bowling form each scaled to 0-1, then the better of the two
+            batting = ewm[:, 0] / max(ewm[:, 0].max(initial=0), 1e-9)
+            bowling = ewm[:, 1] / max(ewm[:, 1].max(initial=0), 1e-9)
+            table['form_score'] = np.maximum(batting, bowling).round(3)
+            self._table = table
+            return table
+
+    def player(self, name):
+        table = self.table()
+        return table.loc[name] if name in table.index else None
+
+# One engine per store file. When the file is rebuilt with more matches, only
+# the innings of the new match ids are appended; the store is append-only, so
+# existing match ids keep their meaning. A store that lost matches, or whose new
+# matches predate what the engine has seen, is replayed from scratch.
+_forms = {}
+_forms_lock = threading.Lock()
+
+def get_form_engine(store, **kwargs):
+    """The FormEngine for a loaded deliveries store, kept up to date as the store file grows."""
+    if store is None:
+        return None
+    with _forms_lock:
+        entry = _forms.get(store['path'])
+        if entry is not None and entry['signature'] == store['signature']:
+            return entry['engine']
+        df = store['df']
+        match_ids = df['match_id'].to_numpy()
+        seen = np.unique(match_ids)
+        engine = None
+        if entry is not None and np.isin(entry['matches'], seen).all():
+            new = innings_from_deliveries(df[~np.isin(match_ids, entry['matches'])])
+            as_of = entry['engine'].as_of
+            if len(new) == 0 or as_of is None or new['date'].min() >= as_of:
+                engine = entry['engine']
+                if len(new):
+                    engine.extend(new)
+        if engine is None:
+            engine = FormEngine.from_innings(innings_from_deliveries(df), **kwargs)
+        _forms[store['path']] = {'signature': store['signature'], 'matches': seen, 'engine': engine}
+        return engine
+
+def form_scores(df, engine, column='player'):
+    """form_score aligned to df's rows (0 for players the engine hasn't seen)."""
+    if engine is None:
+        return pd.Series(0.0, index=df.index)
+    return df[column].map(engine.table()['form_score']).fillna(0.0).astype('float64')
+
+# ------------------------------------------------------------------------------
+# Benchmark: python form.py [deliveries.feather]
+# ------------------------------------------------------------------------------
+if __name__ == '__main__':
+    import sys
+    from deliveries_store import STORE_FILE, load_store
+
+    store = load_store(sys.argv[1] if len(sys.argv) > 1 else STORE_FILE)
+    innings = innings_from_deliveries(store['df'])
+    start = time.perf_counter()
+    engine = FormEngine.from_innings(innings)
+    engine.table()
+    build_ms = (time.perf_counter() - start) * 1000
+    player = innings['player'].iat[-1]
+    start = time.perf_counter()
+    for i in range(1000):
+        engine.append(player, engine.as_of, runs=i % 100, balls=60)
+    append_us = (time.perf_counter() - start) / 1000 * 1e6
+    start = time.perf_counter()
+    full = innings.groupby('player').tail(engine.window).groupby('player')[['runs', 'wickets']].sum()
+    recompute_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(innings)} innings, {len(engine.players)} players: build {build_ms:.0f} ms, "
+          f"append {append_us:.1f} us, full last-{engine.window} recompute {recompute_ms:.1f} ms")
@@ -0,0 +1,217 @@
+import re
+import timeit
+from dataclasses import dataclass
+
+# ------------------------------------------------------------------------------
+# Intent routing for chatbot questions
+# ------------------------------------------------------------------------------
+# Each intent has a keyword prefilter and a precompiled pattern. Patterns
+# are only run for intents whose keyword appears in the question, in the same
+# priority order the old if-chain used, and none of them start with a
+# backtracking ".*". The resulting Intent is used by both the text answer and
+# the chart path.
+
+@dataclass(frozen=True)
+class Intent:
+    type: str
+    players: tuple = ()
+    stat: str = None
+    role: str = None
+    n: int = None
+    pitch: str = None
+    # Ball-by-ball split filters
+    overs: tuple = None
+    phase: str = None
+    since: int = None
+    home: bool = None
+
+UNKNOWN = Intent('unknown')
+
+_PATTERNS = {
+    'health': re.compile(r"health[_ ]?status.*of\s+([\w\s\.]+)"),
+    'stat': re.compile(r"what is the (\w+) of ([\w\s\.]+)"),
+    'highest_batsman': re.compile(r"which\s+batsman\s+has\s+(?:the\s+)?highest\s+(\w+)"),
+    'highest_bowler': re.compile(r"which\s+bowler\s+has\s+(?:the\s+)?highest\s+(\w+)"),
+    'allrounder': re.compile(r"(?:which|who)\s+is\s+(?:the\s+)?best\s+all[\s-]rounder"),
+    'compare': re.compile(r"compare\s+([\w\s\.]+)\s+and\s+([\w\s\.]+)(?:'s)?\s+(\w+)"),
+    'xi': re.compile(r"best playing xi.*(spin|fast|dew|slow).*pitch"),
+    'top_n': re.compile(r"top\s+(\d+)\s+(batsmen|batsman|bowlers|bowler)"),
+    'similar_tier': re.compile(r"(?:similar[\s-]tier|same\s+(?:cluster|tier))(?:\s+players)?\s+(?:as|to)\s+([\w\s\.]+)"),
+    'similar': re.compile(r"(?:plays?\s+like|similar\s+to|similar\s+players\s+(?:to|as)|players\s+like)\s+([\w\s\.]+)"),
+    'split': re.compile(r"(?:([a-z][\w\s\.]*?)'s\s+(economy|strike rate|sr|average|ave|runs|wickets)"
+                        r"|(economy|strike rate|sr|average|ave|runs|wickets)\s+of\s+([a-z][\w\s\.]*?))"
+                        r"\s+((?:in|at|since|away|during|from)\b.*)"),
+    'overs': re.compile(r"overs?\s+(\d+)\s*(?:-|–|to)\s*(\d+)"),
+    'phase': re.compile(r"\b(powerplay|middle|death)\b"),
+    'since': re.compile(r"since\s+(\d{4})"),
+    'home': re.compile(r"\b(home|away)\b"),
+    'form': re.compile(r"([a-z][\w\s\.]*?)'s\s+(?:recent\s+|current\s+)?form\b"
+                       r"|form\s+of\s+([\w\s\.]+)"
+                       r"|(in\s+(?:the\s+)?(?:best|top|good)\s+form|in[\s-]form)"),
+    'cluster': re.compile(r"(?:cluster|tier)\s+(?:is|does)\s+([\w\s\.]+?)(?:\s+(?:in|belong\s+to))?\s*(?:\?|$)"),
+}
+
+def _health(m):
+    return Intent('health', players=(m.group(1).strip(),))
+
+def _stat(m):
+    return Intent('stat', players=(m.group(2).strip(),), stat=m.group(1).strip())
+
+def _highest_batsman(m):
+    return Intent('highest', stat=m.group(1), role='batsman')
+
+def _highest_bowler(m):
+    return Intent('highest', stat=m.group(1).rstrip('s'), role='bowler')
+
+def _allrounder(m):
+    return Intent('allrounder')
+
+def _compare(m):
+    return Intent('compare', players=(m.group(1).strip(), m.group(2).strip()),
+                  stat=m.group(3).strip())
+
+def _xi(m):
+    return Intent('xi', pitch=m.group(1))
+
+def _top_n(m):
+    return Intent('top_n', n=int(m.group(1)), role=m.group(2))
+
+def _similar_tier(m):
+    return Intent('similar_tier', players=(m.group(1).strip(),))
+
+def _similar(m):
+    return Intent('similar', players=(m.group(1).strip(),))
+
+def _cluster(m):
+    return Intent('cluster', players=(m.group(1).strip(),))
+
+def _form(m):
+    if m.group(3):
+        return Intent('form')
+    return Intent('form', players=(_possessive_player(m.group(1) or m.group(2)),))
+
+_SPLIT_STATS = {'strike rate': 'sr', 'average': 'ave'}
+
+def _possessive_player(name):
+    # "what is gill's sr" -> "gill"
+    name = name.strip()
+    for prefix in ('what is ', 'how is ', 'what about '):
+        if name.startswith(prefix):
+            return name[len(prefix):]
+    return name
+
+def _split(m):
+    player = _possessive_player(m.group(1) or m.group(4))
+    stat = m.group(2) or m.group(3)
+    filters = m.group(5)
+    overs = _PATTERNS['overs'].search(filters)
+    phase = _PATTERNS['phase'].search(filters)
+    since = _PATTERNS['since'].search(filters)
+    home = _PATTERNS['home'].search(filters)
+    if not (overs or phase or since or home):
+        return None
+    return Intent('split', players=(player,), stat=_SPLIT_STATS.get(stat, stat),
+                  overs=(int(overs.group(1)), int(overs.group(2))) if overs else None,
+                  phase=phase.group(1) if phase else None,
+                  since=int(since.group(1)) if since else None,
+                  home=(home.group(1) == 'home') if home else None)
+
+# (trigger keyword, pattern name, builder) in priority order. A pattern is only
+# run when its keyword occurs in the question; a plain substring test is far
+# cheaper than letting the regex engine try to match at every position.
+_RULES = [
+    ('over', 'split', _split),
+    ('powerplay', 'split', _split),
+    ('since', 'split', _split),
+    ('home', 'split', _split),
+    ('away', 'split', _split),
+    ('health', 'health', _health),
+    ('what is the', 'stat', _stat),
+    ('batsman', 'highest_batsman', _highest_batsman),
+    ('bowler', 'highest_bowler', _highest_bowler),
+    ('rounder', 'allrounder', _allrounder),
+    ('compare', 'compare', _compare),
+    ('best playing xi', 'xi', _xi),
+    ('top', 'top_n', _top_n),
+    ('most fit player', None, lambda m: Intent('most_fit')),
+    ('form', 'form', _form),
+    ('same', 'similar_tier', _similar_tier),
+    ('similar', 'similar_tier', _similar_tier),
+    ('like', 'similar', _similar),
+    ('similar', 'similar', _similar),
+    ('cluster', 'cluster', _cluster),
+    ('tier', 'cluster', _cluster),
+]
+
+def parse_intent(question):
+    """Classifies a question into an Intent (type 'unknown' if nothing matches)."""
+    question_lower = question.lower()
+    for trigger, pattern_name, build in _RULES:
+        if trigger not in question_lower:
+            continue
+        if pattern_name is None:
+            return build(None)
+        m = _PATTERNS[pattern_name].search(question_lower)
+        if m:
+            intent = build(m)
+            if intent is not None:
+                return intent
+    return UNKNOWN
+
+# ------------------------------------------------------------------------------
+# Benchmark against the old regex chain: python intent_router.py
+# ------------------------------------------------------------------------------
+def _legacy_parse(question):
+    # The if-chain answer_question used before this module, kept for comparison.
+    q = question.lower()
+    m = re.match(r".*health[_ ]?status.*of\s+([\w\s\.]+)\??", q)
+    if m:
+        return Intent('health', players=(m.group(1).strip(),))
+    m = re.match(r".*what is the (\w+) of ([\w\s\.]+)\??", q)
+    if m:
+        return Intent('stat', players=(m.group(2).strip(),), stat=m.group(1).strip().lower())
+    m = re.search(r"which\s+batsman\s+has\s+(?:the\s+)?highest\s+(\w+)", q)
+    if m:
+        return Intent('highest', stat=m.group(1).lower(), role='batsman')
+    m = re.search(r"which\s+bowler\s+has\s+(?:the\s+)?highest\s+(\w+)", q)
+    if m:
+        return Intent('highest', stat=m.group(1).lower().rstrip('s'), role='bowler')
+    m = re.search(r"(?:which|who)\s+is\s+(?:the\s+)?best\s+all[\s-]rounder", q)
+    if m:
+        return Intent('allrounder')
+    m = re.search(r"compare\s+([\w\s\.]+)\s+and\s+([\w\s\.]+)(?:'s)?\s+(\w+)", q)
+    if m:
+        return Intent('compare', players=(m.group(1).strip(), m.group(2).strip()),
+                      stat=m.group(3).strip())
+    m = re.match(r".*best playing xi.*(spin|fast|dew|slow).*pitch.*", q)
+    if m:
+        return Intent('xi', pitch=m.group(1))
+    m = re.search(r"top\s+(\d+)\s+(batsmen|batsman|bowlers|bowler)", q)
+    if m:
+        return Intent('top_n', n=int(m.group(1)), role=m.group(2))
+    if re.match(r".*most fit player.*", q):
+        return Intent('most_fit')
+    return UNKNOWN
+
+SAMPLE_QUESTIONS = [
+    "What is the health status of V Kohli?",
+    "what is the runs of shubman gill",
+    "Which batsman has the highest sr?",
+    "Which bowler has the highest wickets?",
+    "Who is the best all-rounder?",
+    "Compare RG Sharma and V Kohli runs",
+    "Suggest the best playing XI for a spin pitch",
+    "Show me the top 5 batsmen",
+    "Who is the most fit player right now?",
+    "Tell me something interesting about cricket in the last few years please",
+]
+
+if __name__ == '__main__':
+    for q in SAMPLE_QUESTIONS:
+        assert parse_intent(q) == _legacy_parse(q), q
+    number = 20000
+    legacy = timeit.timeit(lambda: [_legacy_parse(q) for q in SAMPLE_QUESTIONS], number=number)
+    routed = timeit.timeit(lambda: [parse_intent(q) for q in SAMPLE_QUESTIONS], number=number)
+    per_q = number * len(SAMPLE_QUESTIONS)
+    print(f"regex chain:   {legacy / per_q * 1e6:.2f} us/question")
+    print(f"intent router: {routed / per_q * 1e6:.2f} us/question")
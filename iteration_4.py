@@ -4,6 +4,9 @@ import re
 import os
 import matplotlib.pyplot as plt
 import seaborn as sns
+from data_loader import load_stats, dataset_version, display_value, display_stat, orderable
+from figure_cache import figure_cache, figure_key, render_png
+from scalable_charts import top_k_others
 
 # ------------------------------------------------------------------------------
 # Streamlit page configuration
@@ -18,10 +21,7 @@ if not os.path.exists(data_file):
     st.error(f"File '{data_file}' not found.")
     st.stop()
 
-df = pd.read_csv(data_file)
-df.columns = [col.lower() for col in df.columns]
-df['player'] = df['player'].fillna("")
-df = df.drop_duplicates(subset=['player'])
+df = load_stats(data_file)
 
 # ------------------------------------------------------------------------------
 # Helper Functions
@@ -36,7 +36,8 @@ def get_player_stat(player_name, stat):
     player_row = df[df['player'].str.contains(player_name.strip(), case=False)]
     if not player_row.empty:
         if stat in df.columns:
-            return player_row.iloc[0][stat]
+            row = player_row.iloc[0]
+            return display_stat(stat, row[stat], row.get('hs_not_out', False))
         else:
             return f"Stat '{stat}' not found."
     return f"Player '{player_name}' not found."
@@ -50,10 +51,12 @@ def get_highest_stat_player(stat, role=None):
         filtered_df = df[df['wickets'] > 0]
     else:
         filtered_df = df
-    max_value = filtered_df[stat].max()
-    top_player = filtered_df[filtered_df[stat] == max_value].iloc[0]
+    values = orderable(filtered_df[stat])
+    max_value = values.max()
+    top_player = filtered_df[values == max_value].iloc[0]
     health_status = top_player['health_status']
-    return f"{top_player['player']} has the highest {stat}: {max_value} (Health: {health_status})"
+    shown = display_stat(stat, max_value, top_player.get('hs_not_out', False))
+    return f"{top_player['player']} has the highest {stat}: {shown} (Health: {health_status})"
 
 def get_best_allrounder():
     all_rounders_df = df[(df['runs'] > 100) & (df['wickets'] > 10)]
@@ -75,8 +78,8 @@ def compare_players(player1, player2, stat):
         return "One or both players not found."
     if stat not in df.columns:
         return f"Stat '{stat}' not found."
-    player1_stat = player1_row.iloc[0][stat]
-    player2_stat = player2_row.iloc[0][stat]
+    player1_stat = display_stat(stat, player1_row.iloc[0][stat], player1_row.iloc[0].get('hs_not_out', False))
+    player2_stat = display_stat(stat, player2_row.iloc[0][stat], player2_row.iloc[0].get('hs_not_out', False))
     return (f"{player1_row.iloc[0]['player']}'s {stat}: {player1_stat}\n"
             f"{player2_row.iloc[0]['player']}'s {stat}: {player2_stat}")
 
@@ -132,7 +135,7 @@ def top_n_players(role='batsman', n=5):
         if role_type.lower() == 'batsman':
             stat = f"{row['runs']} runs"
         else:
-            stat = f"{row['wickets']} wickets at Economy {row['economy']}"
+            stat = f"{row['wickets']} wickets at Economy {display_value(row['economy'])}"
         response += f"- {row['player']} ({stat}, Health: {row['health_status']})\n"
     return response.strip()
 
@@ -212,16 +215,18 @@ def answer_question(question):
 # ------------------------------------------------------------------------------
 # Visualization Functions
 # ------------------------------------------------------------------------------
-def plot_batting_stats(players=None, stat='runs'):
+# Figures are drawn once per (chart, players, stat, dataset version) and kept
+# as PNG bytes in the shared figure cache; reruns show the cached image.
+def _stat_bar_png(players, stat):
     if players is None:
         # Get top 10 players by the selected stat
         players_df = df.sort_values(by=stat, ascending=False).head(10)
     else:
-        players_df = df[df['player'].isin(players)]
+        # Beyond MAX_BARS selected players the rest share one "Others (avg of n)" bar
+        players_df = top_k_others(df[df['player'].isin(players)], 'player', stat)
     
     if players_df.empty:
-        st.error("No players found with the selected criteria.")
-        return
+        return None
     
     fig, ax = plt.subplots(figsize=(10, 6))
     sns.barplot(x='player', y=stat, data=players_df, ax=ax)
@@ -230,35 +235,30 @@ def plot_batting_stats(players=None, stat='runs'):
     ax.set_ylabel(stat.title())
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    st.pyplot(fig)
+    return render_png(fig)
 
-def plot_bowling_stats(players=None, stat='wickets'):
-    if players is None:
-        # Get top 10 players by the selected stat
-        players_df = df.sort_values(by=stat, ascending=False).head(10)
-    else:
-        players_df = df[df['player'].isin(players)]
-    
-    if players_df.empty:
+def _show_stat_bar(kind, players, stat):
+    key = figure_key(kind, players, stat, dataset_version(df))
+    png = figure_cache.get_or_render(key, lambda: _stat_bar_png(players, stat))
+    if png is None:
         st.error("No players found with the selected criteria.")
         return
-    
-    fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(x='player', y=stat, data=players_df, ax=ax)
-    ax.set_title(f'Comparison of {stat.title()} for Selected Players')
-    ax.set_xlabel('Player')
-    ax.set_ylabel(stat.title())
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    st.pyplot(fig)
+    st.image(png)
 
-def plot_player_comparison(player1, player2):
+def plot_batting_stats(players=None, stat='runs'):
+    _show_stat_bar('batting', players, stat)
+
+def plot_bowling_stats(players=None, stat='wickets'):
+    _show_stat_bar('bowling', players, stat)
+
+def _comparison_png(player1, player2, errors):
+    """PNG comparing two players, or None with the reason appended to errors."""
     player1_data = df[df['player'].str.contains(player1, case=False)]
     player2_data = df[df['player'].str.contains(player2, case=False)]
     
     if player1_data.empty or player2_data.empty:
-        st.error("One or both players not found.")
-        return
+        errors.append("One or both players not found.")
+        return None
     
     # Select relevant stats for comparison
     batting_stats = ['runs', 'ave', 'sr', 'hs']
@@ -283,8 +283,8 @@ def plot_player_comparison(player1, player2):
     comparison_df = pd.DataFrame(comparison_data)
     
     if comparison_df.empty:
-        st.error("No comparable stats found for these players.")
-        return
+        errors.append("No comparable stats found for these players.")
+        return None
     
     # Plot batting stats
     fig, axes = plt.subplots(1, 2, figsize=(15, 6))
@@ -310,9 +310,20 @@ def plot_player_comparison(player1, player2):
         axes[1].tick_params(axis='x', rotation=45)
     
     plt.tight_layout()
-    st.pyplot(fig)
+    return render_png(fig)
 
-def plot_health_distribution():
+def plot_player_comparison(player1, player2):
+    # Keyed on the names as typed (matching ignores case), so a repeat comparison
+    # skips the player search and the data prep as well as the drawing
+    key = figure_key('comparison', (player1.lower(), player2.lower()), None, dataset_version(df))
+    errors = []
+    png = figure_cache.get_or_render(key, lambda: _comparison_png(player1, player2, errors))
+    if png is None:
+        st.error(errors[0])
+        return
+    st.image(png)
+
+def _health_png():
     health_counts = df['health_status'].value_counts()
     
     fig, ax = plt.subplots(figsize=(10, 6))
@@ -322,7 +333,11 @@ def plot_health_distribution():
     ax.set_ylabel('Number of Players')
     plt.xticks(rotation=45)
     plt.tight_layout()
-    st.pyplot(fig)
+    return render_png(fig)
+
+def plot_health_distribution():
+    key = figure_key('health', None, 'health_status', dataset_version(df))
+    st.image(figure_cache.get_or_render(key, _health_png))
 
 # ------------------------------------------------------------------------------
 # Main UI Layout using Tabs and Containers
@@ -1,8 +1,18 @@
 import streamlit as st
-import pandas as pd
-import re
+import html
 import os
+import re
+import uuid
 import plotly.express as px
+from data_loader import load_info, format_bytes
+from intent_router import parse_intent
+from xi_solver import get_optimized_xi, describe_xi
+from chatbot_engine import get_engine
+from answer_cache import answer_cache
+from figure_cache import figure_cache, figure_key, plotly_figure
+from scalable_charts import top_k_others, histogram_frame, scatter_figure
+from query_executor import ANSWER_TIMEOUT, CHART_TIMEOUT, ExecutorBusy, get_executor, wait_result
+from chat_history import RETENTION_DAYS, get_chat_history
 
 # ------------------------------------------------------------------------------
 # Streamlit page configuration
@@ -17,185 +27,8 @@ if not os.path.exists(data_file):
     st.error(f"File '{data_file}' not found.")
     st.stop()
 
-df = pd.read_csv(data_file)
-df.columns = [col.lower() for col in df.columns]
-df['player'] = df['player'].fillna("")
-df = df.drop_duplicates(subset=['player'])
-
-# ------------------------------------------------------------------------------
-# Helper Functions (Text Responses)
-# ------------------------------------------------------------------------------
-def get_health_status(player_name):
-    player_row = df[df['player'].str.contains(player_name.strip(), case=False)]
-    if not player_row.empty:
-        return player_row.iloc[0]['health_status']
-    return "Unknown"
-
-def get_player_stat(player_name, stat):
-    player_row = df[df['player'].str.contains(player_name.strip(), case=False)]
-    if not player_row.empty:
-        if stat in df.columns:
-            return player_row.iloc[0][stat]
-        else:
-            return f"Stat '{stat}' not found."
-    return f"Player '{player_name}' not found."
-
-def get_highest_stat_player(stat, role=None):
-    if stat not in df.columns:
-        return f"Stat '{stat}' not found."
-    if role == 'batsman':
-        filtered_df = df[df['runs'] > 100]
-    elif role == 'bowler':
-        filtered_df = df[df['wickets'] > 0]
-    else:
-        filtered_df = df
-    max_value = filtered_df[stat].max()
-    top_player = filtered_df[filtered_df[stat] == max_value].iloc[0]
-    health_status = top_player['health_status']
-    return f"{top_player['player']} has the highest {stat}: {max_value} (Health: {health_status})"
-
-def get_best_allrounder():
-    all_rounders_df = df[(df['runs'] > 100) & (df['wickets'] > 10)]
-    if all_rounders_df.empty:
-        return "No qualified all-rounders found."
-    all_rounders_df['allrounder_rating'] = (
-        all_rounders_df['ave'] * all_rounders_df['sr'] / 100
-        + all_rounders_df['wickets'] * 10
-    )
-    best_allrounder = all_rounders_df.sort_values(by='allrounder_rating', ascending=False).iloc[0]
-    health_status = best_allrounder['health_status']
-    return (f"The best all-rounder is {best_allrounder['player']} "
-            f"with {best_allrounder['runs']} runs and {best_allrounder['wickets']} wickets "
-            f"(Health: {health_status})")
-
-def compare_players(player1, player2, stat):
-    player1_row = df[df['player'].str.contains(player1.strip(), case=False)]
-    player2_row = df[df['player'].str.contains(player2.strip(), case=False)]
-    if player1_row.empty or player2_row.empty:
-        return "One or both players not found."
-    if stat not in df.columns:
-        return f"Stat '{stat}' not found."
-    player1_stat = player1_row.iloc[0][stat]
-    player2_stat = player2_row.iloc[0][stat]
-    return (f"{player1_row.iloc[0]['player']}'s {stat}: {player1_stat}\n"
-            f"{player2_row.iloc[0]['player']}'s {stat}: {player2_stat}")
-
-def best_playing_xi(pitch_type):
-    pitch_type = pitch_type.lower()
-    if pitch_type == 'spin':
-        bowlers = (df[df['economy'] < 4.5]
-                   .sort_values(by=['wickets', 'economy'], ascending=[False, True])
-                   .head(3)['player'].tolist())
-        batsmen = df.sort_values(by='runs', ascending=False).head(6)['player'].tolist()
-        allrounders = ['RA Jadeja', 'Washington Sundar']
-    elif pitch_type == 'fast':
-        bowlers = (df[df['economy'] < 5.5]
-                   .sort_values(by=['wickets', 'economy'], ascending=[False, True])
-                   .head(3)['player'].tolist())
-        batsmen = df.sort_values(by='sr', ascending=False).head(6)['player'].tolist()
-        allrounders = ['HH Pandya', 'SN Thakur']
-    elif pitch_type == 'dew':
-        bowlers = (df[df['economy'] < 5.0]
-                   .sort_values(by='economy')
-                   .head(3)['player'].tolist())
-        batsmen = df.sort_values(by='ave', ascending=False).head(6)['player'].tolist()
-        allrounders = ['AR Patel', 'Washington Sundar']
-    elif pitch_type == 'slow':
-        bowlers = (df[df['economy'] < 6.0]
-                   .sort_values(by=['economy', 'wickets'], ascending=[True, False])
-                   .head(3)['player'].tolist())
-        batsmen = df.sort_values(by='hs', ascending=False).head(6)['player'].tolist()
-        allrounders = ['RA Jadeja', 'Kuldeep Yadav']
-    else:
-        return "Pitch type not recognized. Please specify spin/fast/dew/slow."
-    response = f"Best Playing XI for a {pitch_type}-friendly pitch:\n"
-    for player in (batsmen + allrounders + bowlers):
-        health_status = get_health_status(player)
-        response += f"- {player} (Health: {health_status})\n"
-    return response.strip()
-
-def top_n_players(role='batsman', n=5):
-    role = role.lower()
-    if role in ['batsman', 'batsmen', 'batter', 'batters']:
-        sorted_df = df.sort_values(by='runs', ascending=False).head(n)
-        role_type = 'Batsman'
-    elif role in ['bowler', 'bowlers']:
-        sorted_df = (df.sort_values(by=['wickets', 'economy'], ascending=[False, True])
-                     .head(n))
-        role_type = 'Bowler'
-    else:
-        return f"Role '{role}' not recognized. Please specify either batsman or bowlers."
-    response = f"Top {n} {role_type}:\n"
-    for _, row in sorted_df.iterrows():
-        if role_type.lower() == 'batsman':
-            stat = f"{row['runs']} runs"
-        else:
-            stat = f"{row['wickets']} wickets at Economy {row['economy']}"
-        response += f"- {row['player']} ({stat}, Health: {row['health_status']})\n"
-    return response.strip()
-
-def most_fit_player():
-    fit_players = df[df['health_status'] == 'Fully Fit']
-    if fit_players.empty:
-        return "No fully fit players found."
-    top_fit_player = fit_players.sort_values(by='mat', ascending=False).iloc[0]
-    return (f"The most fit player currently is {top_fit_player['player']} "
-            f"(Matches Played: {top_fit_player['mat']}).")
-
-def answer_question(question):
-    question_lower = question.lower()
-    # Health Status Query
-    health_match = re.match(r".*health[_ ]?status.*of\s+([\w\s\.]+)\??", question_lower)
-    if health_match:
-        player_name = health_match.group(1).strip()
-        status = get_health_status(player_name)
-        if status == "Unknown":
-            return f"Player '{player_name}' not found or health status unavailable."
-        return f"{player_name}'s current Health Status: {status}"
-    # Specific Player Stat Query
-    stat_match = re.match(r".*what is the (\w+) of ([\w\s\.]+)\??", question_lower)
-    if stat_match:
-        stat = stat_match.group(1).strip().lower()
-        player_name = stat_match.group(2).strip()
-        result = get_player_stat(player_name, stat)
-        return f"{player_name}'s {stat}: {result}"
-    # Highest Stat Query for Batsmen
-    highest_batsman_match = re.search(r"which\s+batsman\s+has\s+(?:the\s+)?highest\s+(\w+)", question_lower)
-    if highest_batsman_match:
-        stat = highest_batsman_match.group(1).lower()
-        return get_highest_stat_player(stat, role='batsman')
-    # Highest Stat Query for Bowlers
-    highest_bowler_match = re.search(r"which\s+bowler\s+has\s+(?:the\s+)?highest\s+(\w+)", question_lower)
-    if highest_bowler_match:
-        stat = highest_bowler_match.group(1).lower().rstrip('s')
-        return get_highest_stat_player(stat, role='bowler')
-    # Best All-rounder Query
-    allrounder_match = re.search(r"(?:which|who)\s+is\s+(?:the\s+)?best\s+all[\s-]rounder", question_lower)
-    if allrounder_match:
-        return get_best_allrounder()
-    # Player Comparison Query
-    compare_match = re.search(r"compare\s+([\w\s\.]+)\s+and\s+([\w\s\.]+)(?:'s)?\s+(\w+)", question_lower)
-    if compare_match:
-        player1 = compare_match.group(1).strip()
-        player2 = compare_match.group(2).strip()
-        stat = compare_match.group(3).strip()
-        return compare_players(player1, player2, stat)
-    # Best Playing XI Query
-    xi_match = re.match(r".*best playing xi.*(spin|fast|dew|slow).*pitch.*", question_lower)
-    if xi_match:
-        pitch_type = xi_match.group(1)
-        return best_playing_xi(pitch_type)
-    # Top N Players Query
-    top_n_match = re.search(r"top\s+(\d+)\s+(batsmen|batsman|bowlers|bowler)", question_lower)
-    if top_n_match:
-        n = int(top_n_match.group(1))
-        role = top_n_match.group(2)
-        return top_n_players(role=role, n=n)
-    # Most Fit Player Query
-    fit_match = re.match(r".*most fit player.*", question_lower)
-    if fit_match:
-        return most_fit_player()
-    return "Sorry! I couldn't understand your query."
+engine = get_engine(data_file)
+df = engine.df
 
 # ------------------------------------------------------------------------------
 # Plotting Functions
@@ -203,19 +36,16 @@ def answer_question(question):
 def plot_multiple_players_stats(players_list, stat, title=""):
     """
     Creates a bar chart comparing the given stat for multiple players.
-    Non-numeric values will be shown as None.
+    Non-numeric values will be shown as None. Beyond MAX_BARS players the rest
+    are folded into one "Others (avg of n)" bar. The figure's JSON is kept in the shared
+    figure cache, so showing the same chart again skips building it.
     """
-    data = []
-    for player in players_list:
-        val = get_player_stat(player, stat)
-        # Attempt to convert to float
-        try:
-            val = float(val)
-        except (ValueError, TypeError):
-            val = None
-        data.append({"Player": player, stat: val})
-    
-    chart_df = pd.DataFrame(data)
+    key = figure_key(('bar', title), players_list, stat, engine.version)
+    return plotly_figure(figure_cache.get_or_render(
+        key, lambda: _players_bar(players_list, stat, title).to_json()))
+
+def _players_bar(players_list, stat, title):
+    chart_df = top_k_others(engine.player_stats_frame(players_list, [stat]), "Player", stat)
     fig = px.bar(
         chart_df,
         x="Player",
@@ -229,6 +59,29 @@ def plot_multiple_players_stats(players_list, stat, title=""):
     fig.update_layout(yaxis_title=stat.capitalize(), xaxis_title="Player")
     return fig
 
+def plot_stat_distribution(stat):
+    """Histogram of a stat over all players, binned here so the chart has MAX_BINS bars at most."""
+    key = figure_key('distribution', None, stat, engine.version)
+    return plotly_figure(figure_cache.get_or_render(key, lambda: _distribution_bar(stat).to_json()))
+
+def _distribution_bar(stat):
+    bins = histogram_frame(df[stat])
+    fig = px.bar(bins, x="bin", y="count", title=f"Distribution of {stat.capitalize()}", height=400)
+    fig.update_layout(xaxis_title=stat.capitalize(), yaxis_title="Players", bargap=0.05)
+    return fig
+
+def plot_player_map():
+    """Every player in the clustering's 2-D PCA space, coloured by cluster."""
+    key = figure_key('player_map', None, None, engine.version)
+    return plotly_figure(figure_cache.get_or_render(key, lambda: _player_map_scatter().to_json()))
+
+def _player_map_scatter():
+    table = engine.cluster_table
+    coords = table['coords']
+    return scatter_figure(coords[:, 0], coords[:, 1], color=table['labels'] + 1, text=df['player'],
+                          title="Player Clusters based on Performance Metrics",
+                          x_title="First Principal Component", y_title="Second Principal Component")
+
 # ------------------------------------------------------------------------------
 # Main UI Layout using Tabs and Containers
 # ------------------------------------------------------------------------------
@@ -240,51 +93,106 @@ Use the **Chatbot** tab to ask cricket stat questions.
 Or explore quick stats and visualizations in the **Stats Explorer** tab.
 """
 )
+data_info = load_info(data_file)
+st.sidebar.caption(
+    f"Dataset {data_info['version']}: {data_info['rows']} players, "
+    f"loaded in {data_info['load_seconds'] * 1000:.0f} ms, "
+    f"{format_bytes(data_info['memory_bytes'])} in memory"
+)
+# Filled in at the end of the run, so it counts this run's question too
+cache_caption = st.sidebar.empty()
 
 tabs = st.tabs(["Chatbot", "Stats Explorer"])
 
 # ------------------ CHATBOT TAB ------------------
 with tabs[0]:
     st.header("Cricket Stats Chatbot")
-    if "history" not in st.session_state:
-        st.session_state.history = []
+    # The conversation lives in the SQLite chat history. Signed-in users (st.login)
+    # keep it under their account, across reloads and server restarts. Anyone
+    # else gets a random id kept in a browser cookie (set once, for as long as
+    # the history is retained), never in the URL, so a shared link doesn't
+    # expose the conversation but a reload or restart picks it up again. Only
+    # the last HISTORY_PAGE turns are shown; "Load earlier" adds another page.
+    HISTORY_PAGE = 10
+    CHAT_COOKIE = "cricket_chat"
+    history = get_chat_history()
+    if st.user.get("is_logged_in"):
+        session_id = f"user:{st.user.get('email') or st.user.get('sub')}"
+    else:
+        if "chat_session" not in st.session_state:
+            cookie = st.context.cookies.get(CHAT_COOKIE)
+            valid = isinstance(cookie, str) and re.fullmatch(r"[0-9a-f]{32}", cookie)
+            st.session_state.chat_session = cookie if valid else uuid.uuid4().hex
+        session_id = st.session_state.chat_session
+        if st.context.cookies.get(CHAT_COOKIE) != session_id:
+            # st.context.cookies is read when the session connects, so the cookie is
+            # written again on each rerun until the next connection; that is harmless
+            st.html(f"<script>document.cookie = '{CHAT_COOKIE}={session_id}; Path=/; "
+                    f"Max-Age={RETENTION_DAYS * 86400}; SameSite=Strict';</script>",
+                    unsafe_allow_javascript=True)
+    if "history_turns" not in st.session_state:
+        st.session_state.history_turns = HISTORY_PAGE
     
     with st.form("chat_form", clear_on_submit=True):
         user_input = st.text_input("Your question:")
         submitted = st.form_submit_button("Send")
     
+    # Answers and charts run on the shared query pool. The text answer is
+    # waited for first; the chart fills this slot afterwards.
+    chart_slot = st.empty()
     if submitted:
         if user_input.lower() in ["exit", "quit"]:
             st.info("Goodbye!")
         else:
-            response = answer_question(user_input)
-            st.session_state.history.append(("You", user_input))
-            st.session_state.history.append(("Bot", response))
-            # If the question is a compare query, we might show a chart
-            if "compare" in user_input.lower():
-                cmp_match = re.search(r"compare\s+([\w\s\.]+)\s+and\s+([\w\s\.]+)(?:'s)?\s+(\w+)", user_input.lower())
-                if cmp_match:
-                    p1 = cmp_match.group(1).strip()
-                    p2 = cmp_match.group(2).strip()
-                    stat = cmp_match.group(3).strip()
-                    fig = plot_multiple_players_stats([p1, p2], stat,
-                          title=f"Comparison of {stat.capitalize()} for {p1} and {p2}")
-                    # Only show chart if stat is numeric
-                    if fig is not None:
-                        st.plotly_chart(fig, use_container_width=True)
+            intent = parse_intent(user_input)
+            executor = get_executor()
+            try:
+                answer = executor.submit(engine.answer, intent)
+                # If the question is a compare query, build its chart alongside the answer
+                if intent.type == 'compare':
+                    p1, p2 = intent.players
+                    stat = intent.stat
+                    st.session_state.pending_chart = executor.submit(
+                        plot_multiple_players_stats, [p1, p2], stat,
+                        title=f"Comparison of {stat.capitalize()} for {p1} and {p2}")
+                done, response = wait_result(answer, ANSWER_TIMEOUT)
+                if not done:
+                    response = "Sorry, that question took too long to answer."
+            except ExecutorBusy:
+                response = "The chatbot is busy right now. Please try again in a moment."
+            except Exception:
+                response = "Sorry, something went wrong while answering that question."
+            history.add_turn(session_id, user_input, response)
     
-    # Display conversation
-    for speaker, message in st.session_state.history:
-        if speaker == "You":
-            st.markdown(
-                f"<div style='background-color:#e8f5e9; padding:10px; border-radius:5px; margin-bottom:5px'>"
-                f"<strong>You:</strong> {message}</div>", unsafe_allow_html=True
-            )
+    # Display conversation, as one markdown block rather than one per message.
+    # Stored text is escaped: it is user input rendered as HTML.
+    if history.turn_count(session_id) > st.session_state.history_turns:
+        def load_earlier():
+            st.session_state.history_turns += HISTORY_PAGE
+        st.button("Load earlier messages", on_click=load_earlier)
+    colors = {"You": "#e8f5e9", "Bot": "#e3f2fd"}
+    st.markdown("".join(
+        f"<div style='background-color:{colors[speaker]}; padding:10px; border-radius:5px; margin-bottom:5px'>"
+        f"<strong>{speaker}:</strong> {html.escape(message, quote=False)}</div>"
+        for speaker, message in history.recent(session_id, st.session_state.history_turns)
+    ), unsafe_allow_html=True)
+
+    pending_chart = st.session_state.get("pending_chart")
+    if pending_chart is not None:
+        chart_slot.caption("Building chart...")
+        try:
+            done, fig = wait_result(pending_chart, CHART_TIMEOUT)
+        except Exception:
+            done, fig = True, None
+        if done:
+            del st.session_state["pending_chart"]
+            # Only show chart if stat is numeric
+            if fig is not None:
+                chart_slot.plotly_chart(fig, use_container_width=True)
+            else:
+                chart_slot.empty()
         else:
-            st.markdown(
-                f"<div style='background-color:#e3f2fd; padding:10px; border-radius:5px; margin-bottom:5px'>"
-                f"<strong>Bot:</strong> {message}</div>", unsafe_allow_html=True
-            )
+            chart_slot.caption("The chart is still loading and will appear on the next update.")
 
 # ------------------ STATS EXPLORER TAB ------------------
 with tabs[1]:
@@ -300,19 +208,42 @@ with tabs[1]:
     with col2:
         if action == "Show Top Players":
             if role_option == "Top Batsmen":
-                st.write(top_n_players("batsman", num_option))
+                st.write(engine.top_n_players("batsman", num_option))
             elif role_option == "Top Bowlers":
-                st.write(top_n_players("bowler", num_option))
+                st.write(engine.top_n_players("bowler", num_option))
             else:
                 st.warning("Please select a valid role.")
         else:
-            st.write(most_fit_player())
+            st.write(engine.most_fit_player())
     
     st.markdown("---")
     st.subheader("Best Playing XI by Pitch Type")
     pitch_type = st.selectbox("Select Pitch Type:", ["-- select --", "Spin", "Fast", "Dew", "Slow"])
     if pitch_type != "-- select --":
-        st.write(best_playing_xi(pitch_type.lower()))
+        st.write(engine.best_playing_xi(pitch_type.lower()))
+    
+    st.markdown("---")
+    st.subheader("Optimized Playing XI")
+    st.caption("Best combined batting/bowling score with role, keeper and overseas limits; injured players excluded.")
+    if st.button("Pick Optimized XI"):
+        st.write(describe_xi(get_optimized_xi(df, engine.xi_config, engine.form_engine)))
+    
+    # ---- Similar Players ----
+    st.markdown("---")
+    st.subheader("Similar Players")
+    similar_to = st.selectbox("Find players who play like:", ["-- select --"] + df['player'].tolist())
+    similar_count = st.slider("Number of similar players:", 1, 10, 5, key="similar_count")
+    if similar_to != "-- select --":
+        st.write(engine.similar_players(similar_to, similar_count))
+    
+    # ---- Player Map and Distributions ----
+    st.markdown("---")
+    st.subheader("Player Map")
+    if st.checkbox("Show all players by cluster", key="show_player_map"):
+        st.plotly_chart(plot_player_map(), use_container_width=True)
+    distribution_stat = st.selectbox("Distribution of:", ["runs", "ave", "sr", "wickets", "economy"],
+                                     key="distribution_stat")
+    st.plotly_chart(plot_stat_distribution(distribution_stat), use_container_width=True)
     
     # ---- New: Batters Visualization ----
     st.markdown("---")
@@ -349,3 +280,15 @@ with tabs[1]:
             st.plotly_chart(fig_bowl, use_container_width=True)
         else:
             st.warning("Please select at least one bowler.")
+
+# ------------------------------------------------------------------------------
+# Answer and figure cache counters
+# ------------------------------------------------------------------------------
+cache_metrics = answer_cache.metrics()
+figure_metrics = figure_cache.metrics()
+cache_caption.caption(
+    f"Answer cache: {cache_metrics['hits']} hits, {cache_metrics['misses']} misses, "
+    f"{cache_metrics['entries']}/{cache_metrics['max_entries']} entries. "
+    f"Figure cache: {figure_metrics['hits']} hits, {figure_metrics['entries']} figures, "
+    f"{format_bytes(figure_metrics['bytes'])}"
+)
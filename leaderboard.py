@@ -0,0 +1,95 @@
+import hashlib
+import pandas as pd
+from data_loader import cached_derived
+
+# ------------------------------------------------------------------------------
+# Precomputed leaderboards
+# ------------------------------------------------------------------------------
+# Sorted row positions for every (ordering, role) pair are computed once when a
+# dataset is loaded. A top-N query is then a slice of an existing ordering and
+# a "highest X" query is its first element; nothing is sorted per request.
+#
+# Orderings are stable sorts, so ties keep the frame's row order, the same row
+# df[df[stat] == max].iloc[0] would pick.
+
+# Row filters used by the "which batsman/bowler has the highest ..." questions
+ROLE_FILTERS = {
+    None: [],
+    'batsman': [('runs', lambda col: col > 100)],
+    'bowler': [('wickets', lambda col: col > 0)],
+}
+
+# Named multi-column orderings, on top of one descending ordering per numeric
+# stat column (keyed by the column name itself).
+COMPOSITE_ORDERINGS = {
+    'bowlers': [('wickets', False), ('economy', True)],
+}
+
+_last_built = None
+
+def _fingerprint(series):
+    hashed = pd.util.hash_pandas_object(series, index=False).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+def _ordering_specs(df):
+    specs = {}
+    for col in df.select_dtypes(include='number').columns:
+        specs[col] = [(col, False)]
+    for name, spec in COMPOSITE_ORDERINGS.items():
+        if all(col in df.columns for col, _ in spec):
+            specs[name] = spec
+    return specs
+
+def _sorted_positions(df, spec, role):
+    frame = df[[col for col, _ in spec]].reset_index(drop=True)
+    for col, keep in ROLE_FILTERS[role]:
+        frame = frame[keep(df[col].to_numpy())]
+    frame = frame.sort_values(by=[col for col, _ in spec],
+                              ascending=[asc for _, asc in spec],
+                              kind='stable', na_position='last')
+    return frame.index.to_numpy()
+
+def build_leaderboards(df, previous=None):
+    """
+    Builds {(ordering, role): row positions} for df. When previous leaderboards
+    are given, orderings whose input columns hash the same are reused as-is and
+    only the affected ones are re-sorted.
+    """
+    fingerprints = {col: _fingerprint(df[col]) for col in df.columns}
+    orderings = {}
+    rebuilt = 0
+    for name, spec in _ordering_specs(df).items():
+        for role, role_filter in ROLE_FILTERS.items():
+            if any(col not in df.columns for col, _ in role_filter):
+                continue
+            inputs = ['player'] + [col for col, _ in spec] + [col for col, _ in role_filter]
+            key = (name, role)
+            if (previous is not None and key in previous['orderings']
+                    and all(previous['fingerprints'].get(col) == fingerprints[col] for col in inputs)):
+                orderings[key] = previous['orderings'][key]
+            else:
+                orderings[key] = _sorted_positions(df, spec, role)
+                rebuilt += 1
+    return {'orderings': orderings, 'fingerprints': fingerprints, 'rebuilt': rebuilt}
+
+def get_leaderboards(df):
+    """Leaderboards for a frame from data_loader, rebuilt incrementally on reload."""
+    def build(frame):
+        global _last_built
+        _last_built = build_leaderboards(frame, previous=_last_built)
+        return _last_built
+    return cached_derived(df, 'leaderboards', build)
+
+def top_positions(leaderboards, ordering, n, role=None):
+    """Row positions of the top n rows, or None if the ordering isn't precomputed."""
+    positions = leaderboards['orderings'].get((ordering, role))
+    if positions is None:
+        return None
+    return positions[:n]
+
+def highest_position(leaderboards, stat, role=None):
+    """Row position holding the highest value of stat, or None."""
+    positions = top_positions(leaderboards, stat, 1, role)
+    if positions is None or len(positions) == 0:
+        return None
+    return positions[0]
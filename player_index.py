@@ -0,0 +1,279 @@
+import json
+import os
+import re
+import time
+from collections import defaultdict
+import numpy as np
+
+# ------------------------------------------------------------------------------
+# Player name index
+# ------------------------------------------------------------------------------
+# Maps normalized name forms to row positions so lookups don't have to scan the
+# whole 'player' column with str.contains on every question.
+#   "V Kohli"      -> "v kohli", "kohli"
+#   "Shubman Gill" -> "shubman gill", "s gill", "gill", "shubman", "gill shubman"
+# A query like "virat kohli" is reduced to its initials form ("v kohli") at
+# lookup time, so it still hits the "V Kohli" row. Nicknames and first names
+# that can't be derived from the name ("rohit" -> "RG Sharma") come from
+# player_aliases.json.
+#
+# Queries that hit no key ("kholi", "chahl", "kis") go through a fuzzy path:
+# a character-trigram inverted index over every name and alias proposes the
+# RERANK names sharing the most trigrams, and those are reranked by per-token
+# edit distance. resolve_player returns the ranked candidates with a 0-1
+# confidence. It only commits to a match when the best one is confident and
+# clearly ahead of the runner-up, so "pandya" asks which Pandya instead of
+# quietly returning the first one.
+
+ALIASES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "player_aliases.json")
+
+MIN_CONFIDENCE = 0.7   # below this a fuzzy candidate is only a suggestion
+MARGIN = 0.1           # best candidate must beat the runner-up by this much
+RERANK = 20            # trigram candidates reranked by edit distance
+
+def normalize_name(name):
+    name = re.sub(r"[^\w\s]", " ", str(name).lower())
+    return " ".join(name.split())
+
+def initials_form(name):
+    """'shubman gill' -> 's gill', 'rg sharma' -> 'r sharma'."""
+    tokens = normalize_name(name).split()
+    if len(tokens) < 2:
+        return None
+    return " ".join([t[0] for t in tokens[:-1]] + [tokens[-1]])
+
+def name_keys(name):
+    """All index keys for one player name, most specific first."""
+    norm = normalize_name(name)
+    if not norm:
+        return []
+    tokens = norm.split()
+    keys = [norm]
+    initials = initials_form(norm)
+    if initials:
+        keys.append(initials)
+    # Single tokens: always the surname, plus any other token that isn't a
+    # bare initials block like "rg".
+    keys.append(tokens[-1])
+    keys.extend(t for t in tokens[:-1] if len(t) > 2)
+    # Word order doesn't matter: "gill shubman"
+    if len(tokens) > 1:
+        keys.append(sorted_form(norm))
+    return list(dict.fromkeys(keys))
+
+def sorted_form(name):
+    return " ".join(sorted(normalize_name(name).split()))
+
+def trigrams(name):
+    """Character trigrams of each token, padded so short tokens still have some."""
+    grams = set()
+    for token in normalize_name(name).split():
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def load_aliases(path=ALIASES_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def build_player_index(df, column='player', aliases=None):
+    """
+    Builds {key: [row positions]} for every name in df[column] and its aliases,
+    plus the trigram index over the same names. Positions are iloc positions
+    in ascending order, so the first entry is the same row
+    str.contains(...).iloc[0] would have returned.
+    """
+    if aliases is None:
+        aliases = load_aliases()
+    index = {}
+    normalized = []
+    # Every name and alias is a "form" of a row; fuzzy matching works on forms
+    form_names, form_rows = [], []
+    for pos, name in enumerate(df[column].tolist()):
+        normalized.append(normalize_name(name))
+        for form in [name] + aliases.get(name, []):
+            for key in name_keys(form):
+                positions = index.setdefault(key, [])
+                if not positions or positions[-1] != pos:
+                    positions.append(pos)
+            form_names.append(normalize_name(form))
+            form_rows.append(pos)
+    postings = defaultdict(list)
+    gram_counts = np.zeros(len(form_names), dtype='int32')
+    for form_id, form in enumerate(form_names):
+        grams = trigrams(form)
+        gram_counts[form_id] = len(grams)
+        for gram in grams:
+            postings[gram].append(form_id)
+    return {
+        'normalized': normalized,
+        'keys': index,
+        'forms': form_names,
+        'form_tokens': [form.split() for form in form_names],
+        'form_rows': np.array(form_rows, dtype='int64'),
+        'gram_counts': gram_counts,
+        'trigrams': {gram: np.array(ids, dtype='int32') for gram, ids in postings.items()},
+    }
+
+def _edit_distance(a, b):
+    """Optimal string alignment distance: Levenshtein plus adjacent transpositions."""
+    if a == b:
+        return 0
+    prev2, prev = None, list(range(len(b) + 1))
+    last_a = None
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        left = i
+        last_b = None
+        for j, cb in enumerate(b, 1):
+            if ca == cb:
+                value = prev[j - 1]
+            else:
+                value = min(prev[j], left, prev[j - 1]) + 1
+                if ca == last_b and last_a == cb and prev2[j - 2] + 1 < value:
+                    value = prev2[j - 2] + 1
+            cur.append(value)
+            left = value
+            last_b = cb
+        prev2, prev = prev, cur
+        last_a = ca
+    return prev[-1]
+
+def _token_similarity(query_token, name_token, multi_token_query):
+    if query_token == name_token:
+        return 1.0
+    if len(name_token) <= 2:
+        # An initials block ("v", "rg") only supports a full first name
+        # alongside other tokens: "virat kohli" but not "virat" alone.
+        return 0.75 if multi_token_query and query_token[0] == name_token[0] else 0.0
+    if len(query_token) >= 3 and name_token.startswith(query_token):
+        return 0.9
+    return 1.0 - _edit_distance(query_token, name_token) / max(len(query_token), len(name_token))
+
+def name_similarity(query, form_tokens, memo=None):
+    """0-1: each query token against its best-matching name token, averaged."""
+    tokens = query.split()
+    multi = len(tokens) > 1
+    if memo is None:
+        memo = {}
+    total = 0.0
+    for t in tokens:
+        best = 0.0
+        for n in form_tokens:
+            key = (t, n)
+            if key not in memo:
+                memo[key] = _token_similarity(t, n, multi)
+            best = max(best, memo[key])
+        total += best
+    return total / len(tokens)
+
+def resolve_player(player_index, query, limit=5):
+    """
+    {'query', 'candidates': [(row position, confidence)] best first,
+     'match': position or None, 'ambiguous': bool}. match is set only for a
+    unique exact key or a fuzzy candidate that is confident and clearly ahead.
+    """
+    norm = normalize_name(query)
+    resolution = {'query': query, 'candidates': [], 'match': None, 'ambiguous': False}
+    if not norm:
+        return resolution
+    keys = player_index['keys']
+    for key in (norm, initials_form(norm), sorted_form(norm)):
+        if key and key in keys:
+            positions = keys[key]
+            resolution['candidates'] = [(pos, 1.0) for pos in positions[:limit]]
+            if len(positions) == 1:
+                resolution['match'] = positions[0]
+            else:
+                resolution['ambiguous'] = True
+            return resolution
+
+    grams = trigrams(norm)
+    postings = [player_index['trigrams'][g] for g in grams if g in player_index['trigrams']]
+    if not postings:
+        return resolution
+    shared = np.bincount(np.concatenate(postings), minlength=len(player_index['forms']))
+    # Only forms sharing at least one trigram are scored
+    candidates = np.flatnonzero(shared)
+    dice = 2.0 * shared[candidates] / (len(grams) + player_index['gram_counts'][candidates])
+    if len(candidates) > RERANK:
+        keep = np.argpartition(-dice, RERANK - 1)[:RERANK]
+        candidates, dice = candidates[keep], dice[keep]
+    best = {}
+    memo = {}
+    for form_id, form_dice in zip(candidates, dice):
+        pos = int(player_index['form_rows'][form_id])
+        score = name_similarity(norm, player_index['form_tokens'][form_id], memo)
+        if score > best.get(pos, (-1.0,))[0]:
+            best[pos] = (score, form_dice)
+    ranked = sorted(best.items(), key=lambda item: (-item[1][0], -item[1][1], item[0]))
+    resolution['candidates'] = [(pos, round(score, 3)) for pos, (score, _) in ranked[:limit] if score > 0]
+    candidates = resolution['candidates']
+    if candidates and candidates[0][1] >= MIN_CONFIDENCE:
+        if len(candidates) > 1 and candidates[0][1] - candidates[1][1] < MARGIN:
+            resolution['ambiguous'] = True
+        else:
+            resolution['match'] = candidates[0][0]
+    return resolution
+
+def disambiguation_prompt(resolution, names, min_suggestion=0.5):
+    """
+    A question back to the user when the query was ambiguous or only nearly
+    matched someone, or None when there's nothing useful to ask.
+    names maps row positions to display names (e.g. df['player']).
+    """
+    if resolution['match'] is not None:
+        return None
+    query = resolution['query']
+    if resolution['ambiguous']:
+        top = resolution['candidates'][0][1]
+        options = [names[pos] for pos, confidence in resolution['candidates'] if top - confidence < MARGIN]
+        listed = ", ".join(options[:-1]) + f" or {options[-1]}"
+        return f"'{query}' could be {listed}. Which player did you mean?"
+    suggestions = [names[pos] for pos, confidence in resolution['candidates'] if confidence >= min_suggestion]
+    if suggestions:
+        return f"Player '{query}' not found. Did you mean {' or '.join(suggestions[:3])}?"
+    return None
+
+def lookup_positions(player_index, query):
+    """Candidate row positions for query, best match first. Empty list if none."""
+    return [pos for pos, _ in resolve_player(player_index, query)['candidates']]
+
+def lookup_player(player_index, query):
+    """Row position of the player query confidently resolves to, or None."""
+    return resolve_player(player_index, query)['match']
+
+# ------------------------------------------------------------------------------
+# Benchmark: python player_index.py [names]
+# ------------------------------------------------------------------------------
+if __name__ == '__main__':
+    import sys
+    import pandas as pd
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = np.random.default_rng(0)
+    syllables = ['ra', 'vi', 'sh', 'an', 'ku', 'mar', 'ja', 'de', 'ep', 'su', 'ri', 'ya', 'dav', 'pa',
+                 'tel', 'si', 'ngh', 'ko', 'hli', 'ga', 'ik', 'wad', 'bu', 'mrah', 'cha', 'hal']
+    def word(k):
+        return "".join(rng.choice(syllables, k)).capitalize()
+    names = [f"{word(1)[:2].upper()} {word(rng.integers(2, 4))}" for _ in range(n)]
+    pool = pd.DataFrame({'player': names})
+    start = time.perf_counter()
+    index = build_player_index(pool, aliases={})
+    build_s = time.perf_counter() - start
+    exact = [names[i] for i in rng.integers(0, n, 500)]
+    typos = []
+    for name in exact:
+        chars = list(name.split()[-1].lower())
+        i = int(rng.integers(0, len(chars) - 1))
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+        typos.append("".join(chars))
+    for label, queries in (("exact", exact), ("typo", typos)):
+        start = time.perf_counter()
+        for q in queries:
+            resolve_player(index, q)
+        per_ms = (time.perf_counter() - start) / len(queries) * 1000
+        print(f"{n} names: {label} lookup {per_ms:.3f} ms")
+    print(f"index build {build_s:.1f} s")
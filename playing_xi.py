@@ -0,0 +1,52 @@
+import hashlib
+import json
+import os
+import pandas as pd
+from data_loader import cached_derived
+
+# ------------------------------------------------------------------------------
+# Best Playing XI per pitch type
+# ------------------------------------------------------------------------------
+# There are only a handful of pitch types, so every XI is computed once per
+# (dataset version, config) and then served from cache. The per-pitch rules,
+# including the hand-picked all-rounders, live in playing_xi_config.json.
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "playing_xi_config.json")
+
+def load_config(path=CONFIG_FILE):
+    with open(path) as f:
+        raw = f.read()
+    config = json.loads(raw)
+    config['hash'] = hashlib.sha1(raw.encode()).hexdigest()[:12]
+    return config
+
+def _pick_xi(df, rules, n_batsmen, n_bowlers):
+    bowler_sort = rules['bowler_sort']
+    bowlers = (df[df['economy'] < rules['bowler_max_economy']]
+               .sort_values(by=[col for col, _ in bowler_sort],
+                            ascending=[asc for _, asc in bowler_sort], kind='stable')
+               .head(n_bowlers)['player'].tolist())
+    batsmen = (df.sort_values(by=rules['batsman_sort'], ascending=False, kind='stable')
+               .head(n_batsmen)['player'].tolist())
+    return batsmen + rules['allrounders'] + bowlers
+
+def compute_all_xis(df, config):
+    """{pitch: [(player, health_status), ...]} for every pitch in config."""
+    picks = {pitch: _pick_xi(df, rules, config['batsmen'], config['bowlers'])
+             for pitch, rules in config['pitches'].items()}
+    # Resolve health for every picked name across all pitches in one join
+    selected = pd.DataFrame(
+        [(pitch, order, player) for pitch, players in picks.items()
+         for order, player in enumerate(players)],
+        columns=['pitch', 'order', 'player'])
+    health = df[['player', 'health_status']].drop_duplicates(subset=['player'])
+    selected = selected.merge(health, on='player', how='left')
+    selected['health_status'] = selected['health_status'].astype(object).fillna("Unknown")
+    selected = selected.sort_values(['pitch', 'order'])
+    return {pitch: list(zip(group['player'], group['health_status']))
+            for pitch, group in selected.groupby('pitch', sort=False)}
+
+def get_playing_xis(df, config=None):
+    config = config or load_config()
+    return cached_derived(df, ('playing_xi', config['hash']),
+                          lambda frame: compute_all_xis(frame, config))
@@ -0,0 +1,60 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+# ------------------------------------------------------------------------------
+# Query execution pool
+# ------------------------------------------------------------------------------
+# Chat answers and chart figures run on one process-wide thread pool instead of
+# inline in the Streamlit script run. The pool is shared by every session, and
+# the number of queued-or-running tasks is capped, so a burst of slow queries
+# is turned away instead of piling up. Callers wait for a result with a
+# timeout. A task that overruns keeps its worker until it finishes, because
+# threads can't be killed, but the session that submitted it moves on.
+#
+# Threads rather than processes: the answering code reads the shared,
+# read-only frames loaded by data_loader, and pandas/numpy release the GIL for
+# the heavy parts.
+
+MAX_WORKERS = 4
+MAX_PENDING = 32
+ANSWER_TIMEOUT = 10.0
+CHART_TIMEOUT = 20.0
+
+class ExecutorBusy(RuntimeError):
+    pass
+
+class QueryExecutor:
+    """A thread pool that refuses work beyond max_pending queued-or-running tasks."""
+
+    def __init__(self, max_workers=MAX_WORKERS, max_pending=MAX_PENDING):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, fn, *args, **kwargs):
+        if not self.slots.acquire(blocking=False):
+            raise ExecutorBusy("Too many queries in flight")
+        try:
+            future = self.pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+_executor = None
+_lock = threading.Lock()
+
+def get_executor():
+    """The process-wide QueryExecutor, created on first use."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = QueryExecutor()
+        return _executor
+
+def wait_result(future, timeout):
+    """(True, result) if future finished within timeout, else (False, None). Re-raises task errors."""
+    try:
+        return True, future.result(timeout=timeout)
+    except FutureTimeout:
+        return False, None
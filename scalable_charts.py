@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# ------------------------------------------------------------------------------
+# Charts that scale with the number of players
+# ------------------------------------------------------------------------------
+# The explorer and notebook charts were written for a squad of ~35 players: one
+# bar per player, one marker per player. With every international player loaded
+# that means thousands of categories to draw and serialize. These helpers keep
+# what is sent to the browser bounded, whatever the row count:
+#   - bar charts show the largest MAX_BARS bars and fold the rest into a
+#     single "Others (avg of n)" bar. It is the mean, not the sum: most stats
+#     are rates, and a summed count would dwarf every bar it sits next to
+#   - distributions are binned here and charted as MAX_BINS pre-counted bars
+#   - feature-space scatters use WebGL (Scattergl) up to MAX_POINTS markers,
+#     and switch to a binned density heatmap above that
+# Below the limits the charts are unchanged.
+
+MAX_BARS = 15
+MAX_BINS = 40
+MAX_POINTS = 10000
+DENSITY_BINS = 100
+
+def top_k_others(frame, label, value, k=MAX_BARS, others="Others"):
+    """
+    frame unchanged if it has at most k + 1 rows. Otherwise the k rows with the
+    largest value, plus one row labelled "Others (avg of n)" holding the mean of the rest.
+    """
+    if len(frame) <= k + 1:
+        return frame
+    ranked = frame.sort_values(value, ascending=False, na_position='last', kind='stable')
+    rest = ranked.iloc[k:]
+    folded = pd.DataFrame({label: [f"{others} (avg of {len(rest)})"], value: [rest[value].mean()]})
+    return pd.concat([ranked.iloc[:k][[label, value]], folded], ignore_index=True)
+
+def histogram_frame(values, bins=MAX_BINS):
+    """Counts per equal-width bin of values (NaNs dropped), one row per bin with a 'bin' label."""
+    values = np.asarray(values, dtype='float64')
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return pd.DataFrame({'bin': [], 'start': [], 'end': [], 'count': []})
+    counts, edges = np.histogram(values, bins=bins)
+    return pd.DataFrame({
+        'bin': [f"{lo:.4g}-{hi:.4g}" for lo, hi in zip(edges[:-1], edges[1:])],
+        'start': edges[:-1],
+        'end': edges[1:],
+        'count': counts,
+    })
+
+def scatter_figure(x, y, color=None, text=None, title="", x_title="", y_title="", max_points=MAX_POINTS):
+    """
+    A Plotly scatter of y against x. Up to max_points it is a WebGL scatter with
+    one marker per row (coloured by color, hover text from text); above that,
+    a heatmap of point counts on a DENSITY_BINS x DENSITY_BINS grid.
+    """
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    if len(x) <= max_points:
+        marker = {'size': 7, 'opacity': 0.7}
+        if color is not None:
+            marker.update(color=np.asarray(color), colorscale='Viridis', showscale=True)
+        trace = go.Scattergl(x=x, y=y, mode='markers', marker=marker)
+        if text is not None:
+            trace.update(text=list(text), hovertemplate="%{text}<br>%{x:.2f}, %{y:.2f}<extra></extra>")
+    else:
+        keep = ~(np.isnan(x) | np.isnan(y))
+        counts, x_edges, y_edges = np.histogram2d(x[keep], y[keep], bins=DENSITY_BINS)
+        # Empty cells are left blank rather than drawn as zero
+        z = np.where(counts.T > 0, counts.T, np.nan)
+        trace = go.Heatmap(x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2, z=z,
+                           colorscale='Viridis', colorbar={'title': 'Players'},
+                           hovertemplate="%{x:.2f}, %{y:.2f}: %{z} players<extra></extra>")
+    fig = go.Figure(trace)
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title, height=500)
+    return fig
+
+def draw_scatter(ax, x, y, c=None, max_points=MAX_POINTS, **kwargs):
+    """
+    Matplotlib counterpart of scatter_figure for the notebook: ax.scatter up to
+    max_points, a hexbin density plot above that. Returns the mappable for colorbar().
+    """
+    if len(x) <= max_points:
+        return ax.scatter(x, y, c=c, **kwargs)
+    return ax.hexbin(x, y, gridsize=DENSITY_BINS // 2, mincnt=1, cmap=kwargs.get('cmap', 'viridis'))
@@ -0,0 +1,58 @@
+import time
+import numpy as np
+from scipy.spatial import cKDTree
+from clustering import cluster_features
+from data_loader import cached_derived
+
+# ------------------------------------------------------------------------------
+# "Who plays like X": nearest neighbours in the performance feature space
+# ------------------------------------------------------------------------------
+# Uses the same feature columns as the clustering. They are z-scored into a
+# float32 matrix, and a KD-tree over it is built once per dataset version.
+# A query is then a tree search of k+1 neighbours (the player itself comes
+# back first), not a pass over every player.
+
+def build_similarity_index(df):
+    features = cluster_features(df)
+    X = np.nan_to_num(df[features].to_numpy(dtype='float64'))
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+    scaled = ((X - X.mean(axis=0)) / std).astype('float32')
+    return {'features': features, 'matrix': scaled, 'tree': cKDTree(scaled)}
+
+def get_similarity_index(df):
+    return cached_derived(df, 'similarity', build_similarity_index)
+
+def similar_positions(index, pos, k=5):
+    """[(row position, distance)] of the k players closest to row pos."""
+    n = len(index['matrix'])
+    distances, positions = index['tree'].query(index['matrix'][pos], k=min(k + 1, n))
+    return [(int(p), float(d)) for p, d in zip(np.atleast_1d(positions), np.atleast_1d(distances))
+            if p != pos][:k]
+
+# ------------------------------------------------------------------------------
+# Benchmark: python similarity.py [players]
+# ------------------------------------------------------------------------------
+if __name__ == '__main__':
+    import sys
+    import pandas as pd
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = np.random.default_rng(0)
+    pool = pd.DataFrame({
+        'player': [f"Player {i}" for i in range(n)],
+        'ave': rng.uniform(5, 60, n),
+        'sr': rng.uniform(40, 140, n),
+        'boundary_percentage': rng.uniform(5, 30, n),
+        'economy': rng.uniform(2, 8, n),
+        'wickets': rng.integers(0, 300, n),
+    })
+    start = time.perf_counter()
+    index = build_similarity_index(pool)
+    build_ms = (time.perf_counter() - start) * 1000
+    queries = rng.integers(0, n, 2000)
+    start = time.perf_counter()
+    for pos in queries:
+        similar_positions(index, pos, k=10)
+    query_us = (time.perf_counter() - start) / len(queries) * 1e6
+    print(f"{n} players: build {build_ms:.0f} ms, top-10 query {query_us:.0f} us")
@@ -0,0 +1,123 @@
+import time
+import tracemalloc
+import pandas as pd
+from lxml import etree
+
+# ------------------------------------------------------------------------------
+# Statsguru results table extraction
+# ------------------------------------------------------------------------------
+# Streams the page through lxml's pull parser and keeps only the rows of the
+# results table: the first table whose header row has a 'Player' column. Data
+# rows are the <tr class="data1"> rows under that header. Every other table on
+# the page (query filters, paging links, ...) is discarded element by element
+# as it is parsed, instead of being turned into a DataFrame.
+#
+# The header is checked against the columns Statsguru uses for the query type,
+# so a layout change raises TableSchemaError instead of quietly saving the
+# wrong table (which is how cricket_data.csv ended up holding the page's
+# filter header).
+
+REQUIRED_COLUMNS = {
+    None: ['Player', 'Span', 'Mat'],
+    'batting': ['Player', 'Span', 'Mat', 'Runs', 'HS'],
+    'bowling': ['Player', 'Span', 'Mat', 'Wkts', 'Econ'],
+}
+
+class TableSchemaError(ValueError):
+    pass
+
+def _cell_text(el):
+    return " ".join("".join(el.itertext()).split())
+
+def _release(el):
+    # Drop the parsed subtree and any earlier siblings so memory stays flat
+    el.clear()
+    while el.getprevious() is not None:
+        del el.getparent()[0]
+
+def extract_results_table(html, stat_type=None, chunk_size=64 * 1024):
+    """
+    The results table of a Statsguru page as a DataFrame of strings, or None if
+    the page has no results table (e.g. an empty query). Raises
+    TableSchemaError if the results table is missing expected columns.
+    """
+    parser = etree.HTMLPullParser(events=('end',), tag=('tr', 'table'))
+    header, rows = None, []
+
+    def handle(events):
+        nonlocal header
+        for _, el in events:
+            if el.tag == 'table':
+                if header is not None:
+                    return True
+                _release(el)
+            elif header is None:
+                cells = [_cell_text(th) for th in el.findall('th')]
+                if 'Player' in cells:
+                    header = cells
+                _release(el)
+            else:
+                if el.get('class') == 'data1':
+                    rows.append([_cell_text(td) for td in el.findall('td')])
+                _release(el)
+        return False
+
+    done = False
+    for start in range(0, len(html), chunk_size):
+        parser.feed(html[start:start + chunk_size])
+        if handle(parser.read_events()):
+            done = True
+            break
+    if not done:
+        parser.close()
+        handle(parser.read_events())
+
+    if header is None:
+        return None
+    missing = [col for col in REQUIRED_COLUMNS.get(stat_type, REQUIRED_COLUMNS[None]) if col not in header]
+    if missing:
+        raise TableSchemaError(f"Results table is missing columns {missing}; got {header}")
+    rows = [row for row in rows if len(row) == len(header)]
+    table = pd.DataFrame(rows, columns=header)
+    # Statsguru's trailing icon column has no header
+    return table.loc[:, [col for col in header if col]]
+
+# ------------------------------------------------------------------------------
+# Benchmark against pd.read_html: python statsguru_table.py [saved_page.html ...]
+# ------------------------------------------------------------------------------
+def _synthetic_page(n_rows=200, filler_tables=20):
+    filler = "".join(
+        f"<table class='engineTable'><tr><td>Filter {i}</td><td><a href='#'>change</a></td></tr></table>"
+        for i in range(filler_tables))
+    rows = "".join(
+        f"<tr class='data1'><td><a href='/player/{i}'>Player {i}</a></td><td>2020-2025</td>"
+        f"<td>{i % 50}</td><td>{i % 40}</td><td>{i % 5}</td><td>{i * 7}</td><td>{i % 150}*</td>"
+        f"<td>{i % 60}.12</td><td>{i * 9}</td><td>{80 + i % 40}.5</td><td></td></tr>"
+        for i in range(n_rows))
+    return (f"<html><head><title>Statsguru</title></head><body>{filler}"
+            "<table class='engineTable'><caption>Overall figures</caption><thead><tr class='headlinks'>"
+            "<th>Player</th><th>Span</th><th>Mat</th><th>Inns</th><th>NO</th><th>Runs</th><th>HS</th>"
+            "<th>Ave</th><th>BF</th><th>SR</th><th></th></tr></thead>"
+            f"<tbody>{rows}</tbody></table>{filler}</body></html>")
+
+def _measure(fn, html, repeat):
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.process_time()
+    for _ in range(repeat):
+        fn(html)
+    return (time.process_time() - start) / repeat * 1000, peak
+
+if __name__ == '__main__':
+    import sys
+    from io import StringIO
+
+    pages = [open(path, encoding='utf-8').read() for path in sys.argv[1:]] or [_synthetic_page()]
+    for html in pages:
+        read_html_ms, read_html_peak = _measure(lambda h: pd.read_html(StringIO(h)), html, 20)
+        extract_ms, extract_peak = _measure(extract_results_table, html, 20)
+        print(f"{len(html) / 1024:.0f} KB page")
+        print(f"  pd.read_html:          {read_html_ms:6.2f} ms CPU, peak {read_html_peak / 1024:7.0f} KB")
+        print(f"  extract_results_table: {extract_ms:6.2f} ms CPU, peak {extract_peak / 1024:7.0f} KB")
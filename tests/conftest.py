@@ -0,0 +1,13 @@
+import os
+import sys
+import pytest
+
+# The apps are flat scripts run from the repository root, and read their data
+# files relative to it
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+@pytest.fixture
+def in_root(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    return ROOT
@@ -0,0 +1,46 @@
+import os
+import pytest
+from streamlit.testing.v1 import AppTest
+from batch_answer import answer_batch
+from chatbot_engine import get_engine
+
+SPAN_ANSWER = "B Sai Sudharshan has the highest span: 2023-2023 (Health: Recovering)"
+
+@pytest.fixture
+def engine(in_root):
+    return get_engine()
+
+def ask_app(root, script, question):
+    """The chatbot's reply to question in one of the Streamlit apps."""
+    at = AppTest.from_file(os.path.join(root, script), default_timeout=60)
+    at.run()
+    at.text_input[0].input(question)
+    at.button[0].click()
+    at.run()
+    assert not at.exception
+    return "\n".join(m.value for m in at.markdown)
+
+# span and health_status are categoricals in the typed frame, which max() rejects
+def test_highest_categorical_stat(engine):
+    assert engine.answer_question("Which batsman has the highest span?") == SPAN_ANSWER
+    assert engine.ask("Which batsman has the highest span?")['text'] == SPAN_ANSWER
+
+def test_highest_categorical_stat_in_batch(engine):
+    results = answer_batch(engine, ["Which batsman has the highest span?", "top 3 bowlers"])
+    assert results[0]['text'] == SPAN_ANSWER
+
+def test_highest_categorical_stat_in_iteration_4(in_root):
+    assert SPAN_ANSWER in ask_app(in_root, "iteration_4.py", "Which batsman has the highest span?")
+
+# Rates are float32 in the typed frame and must print as the CSV had them
+@pytest.mark.parametrize("question, expected", [
+    ("what is the economy of jj bumrah", "jj bumrah's economy: 2.92"),
+    ("what is the sr of kohli", "kohli's sr: 56.85"),
+    ("top 3 bowlers", "Economy 4.22"),
+    ("which bowler has highest economy", "SV Samson has the highest economy: 7.6 "),
+    ("compare kohli and bumrah economy", "JJ Bumrah's economy: 2.92"),
+])
+def test_iteration_4_rounds_float_stats(in_root, question, expected):
+    reply = ask_app(in_root, "iteration_4.py", question)
+    assert expected in reply
+    assert "0000" not in reply and "9999" not in reply
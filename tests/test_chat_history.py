@@ -0,0 +1,31 @@
+import os
+from streamlit.testing.v1 import AppTest
+import chat_history
+from chat_history import ChatHistory
+
+def test_recent_pages_whole_turns(tmp_path):
+    history = ChatHistory(str(tmp_path / "history.sqlite3"))
+    for i in range(5):
+        history.add_turn("a", f"question {i}", f"answer {i}")
+    history.add_turn("b", "other session", "other answer")
+    assert history.turn_count("a") == 5
+    assert history.recent("a", 2) == [("You", "question 3"), ("Bot", "answer 3"),
+                                       ("You", "question 4"), ("Bot", "answer 4")]
+    assert history.recent("b", 10) == [("You", "other session"), ("Bot", "other answer")]
+
+def test_chat_escapes_stored_html_and_keeps_session_out_of_url(in_root, tmp_path, monkeypatch):
+    monkeypatch.setattr(chat_history, "HISTORY_FILE", str(tmp_path / "history.sqlite3"))
+    at = AppTest.from_file(os.path.join(in_root, "iteration_4b.py"), default_timeout=60)
+    at.run()
+    at.text_input[0].input("<img src=x onerror=alert(1)>")
+    at.button[0].click()
+    at.run()
+    assert not at.exception
+    chat = "\n".join(m.value for m in at.markdown if "<strong>You:</strong>" in m.value)
+    assert "&lt;img src=x onerror=alert(1)&gt;" in chat
+    assert "<img" not in chat
+    assert not at.query_params
+    # The anonymous id is kept in a cookie so a reload finds the conversation again
+    history_id = at.session_state.chat_session
+    assert any(f"cricket_chat={history_id};" in h.proto.body for h in at.get("html"))
+    assert chat_history.get_chat_history().turn_count(history_id) == 1
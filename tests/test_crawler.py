@@ -0,0 +1,83 @@
+import hashlib
+import logging
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from cricinfo_crawler import crawl
+from statsguru_table import _synthetic_page
+
+BATTING = [{'team': 6, 'class': 2, 'type': 'batting'}]
+
+class SavedPages(BaseHTTPRequestHandler):
+    """Serves pages/<n>.html for page=n, with ETags if server.etags, and 500s for server.failing."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        page = int(re.search(r"page=(\d+)", self.path).group(1))
+        if page in self.server.failing:
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = (self.server.pages / f"{page}.html").read_bytes()
+        etag = hashlib.sha1(body).hexdigest()
+        if self.server.etags and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        if self.server.etags:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture
+def server(tmp_path):
+    pages = tmp_path / "pages"
+    pages.mkdir()
+    for page in (1, 2, 3):
+        html = _synthetic_page(5).replace("Player ", f"P{page}-").replace("<title>Statsguru", f"<title>Page {page} of 3")
+        (pages / f"{page}.html").write_text(html)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SavedPages)
+    server.pages, server.etags, server.failing = pages, True, set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def run_crawl(server, tmp_path):
+    base_url = f"http://127.0.0.1:{server.server_port}/ci/engine/stats/index.html"
+    return lambda queries=BATTING: crawl(queries, str(tmp_path / "cache"), base_url=base_url,
+                                         workers=2, rate=0, retries=0, backoff=0)
+
+def test_first_run_parses_and_unchanged_pages_are_not_parsed_again(server, run_crawl):
+    rows, summary = run_crawl()
+    assert summary['changed'] == 3 and summary['failed'] == 0
+    assert len(rows) == 15 and set(rows['Team']) == {'India'}
+    rows, summary = run_crawl()
+    assert summary['not_modified'] == 3 and rows.empty
+    server.etags = False
+    rows, summary = run_crawl()
+    assert summary['same_content'] == 3 and rows.empty
+
+def test_interrupted_run_resumes(server, run_crawl):
+    server.failing = {3}
+    rows, summary = run_crawl()
+    assert summary['changed'] == 2 and summary['failed'] == 1
+    server.failing = set()
+    rows, summary = run_crawl()
+    assert summary['resumed'] == 2 and summary['changed'] == 1 and summary['failed'] == 0
+    # Pages changed before the interruption are returned too
+    assert len(rows) == 15
+    rows, summary = run_crawl()
+    assert summary['not_modified'] == 3 and rows.empty
+
+def test_schema_error_counts_as_failure(run_crawl, caplog):
+    with caplog.at_level(logging.WARNING, logger="cricinfo_crawler"):
+        rows, summary = run_crawl([{'team': 6, 'class': 2, 'type': 'bowling'}])
+    assert summary['failed'] == 1 and summary['changed'] == 0 and rows.empty
+    assert "missing columns ['Wkts', 'Econ']" in caplog.text
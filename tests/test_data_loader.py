@@ -0,0 +1,61 @@
+import os
+import shutil
+import pandas as pd
+import pytest
+from batch_answer import answer_batch
+from chatbot_engine import get_engine
+from convert_stats import convert
+from data_loader import load_info, load_stats, typed_path
+from xi_solver import get_optimized_xi, describe_xi
+
+@pytest.fixture
+def blank_runs_csv(in_root, tmp_path):
+    """cricket_statsnew2.csv with KL Rahul's Runs cell left blank, as Statsguru exports often are."""
+    raw = pd.read_csv("cricket_statsnew2.csv", dtype=str, keep_default_na=False)
+    raw.loc[raw['Player'] == 'KL Rahul', 'Runs'] = ''
+    path = tmp_path / "blank_runs.csv"
+    raw.to_csv(path, index=False)
+    return str(path)
+
+def test_blank_int_cell_loads_as_nan(blank_runs_csv):
+    df = load_stats(blank_runs_csv)
+    assert df['runs'].dtype == 'float64'
+    assert df.loc[df['player'] == 'KL Rahul', 'runs'].isna().all()
+
+def test_blank_int_cell_answers(blank_runs_csv, tmp_path):
+    engine = get_engine(blank_runs_csv, str(tmp_path / "no_deliveries.feather"))
+    assert engine.answer_question("what is the runs of kl rahul") == "kl rahul's runs: N/A"
+    assert engine.answer_question("who is the best all-rounder").startswith("The best all-rounder is AR Patel")
+    assert engine.player_record("kl rahul")['runs'] is None
+    xi = describe_xi(get_optimized_xi(engine.df, engine.xi_config, engine.form_engine))
+    assert xi.startswith("Optimized Playing XI")
+
+def test_not_out_highest_score_keeps_its_star(in_root, tmp_path):
+    raw = pd.read_csv("cricket_statsnew2.csv", dtype=str, keep_default_na=False)
+    raw.loc[raw['Player'] == 'RG Sharma', 'HS'] = '266*'
+    path = tmp_path / "not_out.csv"
+    raw.to_csv(path, index=False)
+    engine = get_engine(str(path), str(tmp_path / "no_deliveries.feather"))
+    assert engine.answer_question("what is the hs of rohit") == "rohit's hs: 266*"
+    assert engine.answer_question("which batsman has highest hs").startswith("RG Sharma has the highest hs: 266* ")
+    assert "RG Sharma's hs: 266*" in engine.answer_question("compare rohit and gill hs")
+    assert "Shubman Gill's hs: 208\n" in engine.answer_question("compare gill and rohit hs") + "\n"
+    results = answer_batch(engine, ["what is the hs of rohit"])
+    assert results[0]['text'] == "rohit's hs: 266*"
+
+def test_typed_file_only_used_for_the_csv_it_was_written_from(in_root, tmp_path):
+    csv = tmp_path / "stats.csv"
+    shutil.copy("cricket_statsnew2.csv", csv)
+    convert(str(csv))
+    assert load_stats(str(csv)) is not None
+    assert load_info(str(csv))['source'] == typed_path(str(csv.resolve()))
+
+    # Replace the CSV but keep the Feather file's mtime ahead of it, as cp -p would
+    raw = pd.read_csv(csv)
+    raw.loc[raw['Player'] == 'RG Sharma', 'Runs'] = 9999
+    raw.to_csv(csv, index=False)
+    stamp = csv.stat().st_mtime - 60
+    os.utime(csv, (stamp, stamp))
+    df = load_stats(str(csv))
+    assert load_info(str(csv))['source'] == str(csv.resolve())
+    assert df.loc[df['player'] == 'RG Sharma', 'runs'].iat[0] == 9999
@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+from deliveries_store import AWAY, HOME, UNKNOWN, batting_split, encode_store, load_store, write_store
+
+def deliveries(**overrides):
+    rows = {
+        'innings': [1, 1, 1], 'over': [1, 50, 135], 'batter': ['A Batter'] * 3, 'bowler': ['B Bowler'] * 3,
+        'player_out': [None] * 3, 'batting_team': ['India'] * 3, 'bowling_team': ['Australia'] * 3,
+        'batter_runs': [4, 6, 1], 'extras': [0] * 3, 'wides': [0] * 3, 'noballs': [0] * 3,
+        'bowler_wicket': [0] * 3, 'match_id': [0, 1, 2], 'date': ['2023-01-01'] * 3,
+        'venue': ['Ground'] * 3, 'city': ['Mumbai', 'Sydney', None],
+    }
+    rows.update(overrides)
+    return pd.DataFrame(rows)
+
+def test_long_innings_overs_and_missing_city(tmp_path):
+    path = str(tmp_path / "deliveries.feather")
+    write_store(encode_store(deliveries()), path)
+    store = load_store(path)
+    df = store['df']
+    assert df['over'].tolist() == [1, 50, 135]
+    assert df['batting_home'].tolist() == [HOME, AWAY, UNKNOWN]
+    code = df['batter'].cat.categories.get_loc('A Batter')
+    assert batting_split(store, code, home=True)['runs'] == 4
+    assert batting_split(store, code, home=False)['runs'] == 6
+    assert batting_split(store, code)['runs'] == 11
+
+def test_narrowing_refuses_to_overflow():
+    with pytest.raises(ValueError, match="batter_runs"):
+        encode_store(deliveries(batter_runs=[4, 6, 300]))
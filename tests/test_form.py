@@ -0,0 +1,33 @@
+import pandas as pd
+from deliveries_store import encode_store, load_store, match_deliveries, write_store
+from form import FormEngine, get_form_engine, innings_from_deliveries
+
+def match(date, runs, city='Mumbai'):
+    balls = [{'batter': 'A Batter', 'bowler': 'B Bowler', 'runs': {'batter': r, 'extras': 0}} for r in runs]
+    return {'info': {'teams': ['India', 'Australia'], 'dates': [date], 'venue': 'Ground', 'city': city},
+            'innings': [{'team': 'India', 'overs': [{'over': 0, 'deliveries': balls}]}]}
+
+def write_matches(path, matches):
+    frames = []
+    for match_id, parsed in enumerate(map(match_deliveries, matches)):
+        frame = pd.DataFrame(parsed['rows'])
+        frame['match_id'] = match_id
+        frame['date'] = parsed['date']
+        frame['venue'] = parsed['venue']
+        frame['city'] = parsed['city']
+        frames.append(frame)
+    write_store(encode_store(pd.concat(frames, ignore_index=True)), path)
+    return load_store(path)
+
+def test_form_engine_appends_only_new_matches(tmp_path):
+    path = str(tmp_path / "deliveries.feather")
+    matches = [match('2023-01-01', [4, 6]), match('2023-02-01', [1, 0, 2])]
+    engine = get_form_engine(write_matches(path, matches))
+    assert engine.player('A Batter')['innings'] == 2
+    version = engine.version
+    matches.append(match('2023-03-01', [6, 6, 6]))
+    store = write_matches(path, matches)
+    assert get_form_engine(store) is engine
+    assert engine.version == version + 1
+    full = FormEngine.from_innings(innings_from_deliveries(store['df'])).table()
+    pd.testing.assert_frame_equal(engine.table(), full)
@@ -0,0 +1,153 @@
+import time
+import numpy as np
+import pandas as pd
+from scipy.optimize import Bounds, LinearConstraint, milp
+from data_loader import cached_derived
+from features import add_features
+from form import form_scores
+
+# ------------------------------------------------------------------------------
+# Constraint-optimized Playing XI
+# ------------------------------------------------------------------------------
+# Picks the 11 players with the highest total composite score subject to role
+# minimums, a keeper minimum and an overseas cap, with injured players
+# excluded. Solved as a small 0/1 integer program. Each player is a single
+# variable, so all-rounders count towards both role minimums and nobody can be
+# picked twice. The rules live in the "optimizer" section of
+# playing_xi_config.json.
+#
+# Given a FormEngine, each player's recent form_score (0-1) is added to the
+# score with weight form_weight, so an out-of-form player with big career
+# numbers can lose their place.
+
+def composite_scores(df, rules):
+    """Batting and bowling scores from features.py, each scaled to 0-1."""
+    if 'batting_score' not in df.columns:
+        df = add_features(df.copy())
+    batting = df['batting_score'].to_numpy(dtype='float64')
+    bowling = df['bowling_score'].to_numpy(dtype='float64')
+    if batting.max(initial=0) > 0:
+        batting = batting / batting.max()
+    if bowling.max(initial=0) > 0:
+        bowling = bowling / bowling.max()
+    return (rules['batting_weight'] * batting, rules['bowling_weight'] * bowling)
+
+def _candidates(df, rules, form=None):
+    batting, bowling = composite_scores(df, rules)
+    score = batting + bowling
+    if form is not None:
+        score = score + rules.get('form_weight', 0.0) * np.asarray(form, dtype='float64')
+    pool = pd.DataFrame({
+        'player': df['player'].to_numpy(),
+        'health_status': df['health_status'].astype(object).to_numpy(),
+        'batter': (df['runs'] >= rules['batter_min_runs']).to_numpy(),
+        'bowler': (df['wickets'] >= rules['bowler_min_wickets']).to_numpy(),
+        'keeper': df['player'].isin(rules['keepers']).to_numpy(),
+        'overseas': (df['overseas'].astype(bool).to_numpy() if 'overseas' in df.columns
+                     else np.zeros(len(df), dtype=bool)),
+        'score': score,
+    })
+    pool = pool[~pool['health_status'].isin(rules['excluded_health'])]
+    # Pruning: players with the same (batter, bowler, keeper, overseas) flags
+    # are interchangeable as far as the constraints go, so an optimal XI only
+    # ever uses the best `size` players of each flag combination. This keeps
+    # the program at <= 16 * size variables however big the pool is.
+    flags = ['batter', 'bowler', 'keeper', 'overseas']
+    pool = (pool.sort_values('score', ascending=False, kind='stable')
+            .groupby(flags, sort=False).head(rules['size']))
+    return pool
+
+def solve_xi(df, rules, form=None):
+    """
+    Returns the optimal XI as a frame (player, health_status, role flags,
+    score), or None if no XI satisfies the constraints. form is an optional
+    per-row 0-1 recent form score.
+    """
+    pool = _candidates(df, rules, form)
+    if len(pool) < rules['size']:
+        return None
+    ones = np.ones(len(pool))
+    constraints = [
+        LinearConstraint(ones, rules['size'], rules['size']),
+        LinearConstraint(pool['batter'].to_numpy(dtype=float), rules['min_batters'], np.inf),
+        LinearConstraint(pool['bowler'].to_numpy(dtype=float), rules['min_bowlers'], np.inf),
+        LinearConstraint(pool['keeper'].to_numpy(dtype=float), rules['min_keepers'], np.inf),
+        LinearConstraint(pool['overseas'].to_numpy(dtype=float), 0, rules['max_overseas']),
+    ]
+    result = milp(-pool['score'].to_numpy(), constraints=constraints,
+                  integrality=ones, bounds=Bounds(0, 1))
+    if not result.success:
+        return None
+    chosen = pool[result.x > 0.5]
+    return chosen.sort_values('score', ascending=False).reset_index(drop=True)
+
+def get_optimized_xi(df, config, form_engine=None):
+    rules = config['optimizer']
+    if form_engine is None:
+        return cached_derived(df, ('optimized_xi', config['hash']), lambda frame: solve_xi(frame, rules))
+    return cached_derived(df, ('optimized_xi', config['hash'], id(form_engine), form_engine.version),
+                          lambda frame: solve_xi(frame, rules, form_scores(frame, form_engine)))
+
+def describe_xi(xi):
+    if xi is None:
+        return "No XI satisfies the selection constraints."
+    response = f"Optimized Playing XI (total score {xi['score'].sum():.2f}):\n"
+    for _, row in xi.iterrows():
+        roles = [name.title() for name in ['batter', 'bowler', 'keeper', 'overseas'] if row[name]]
+        response += f"- {row['player']} ({', '.join(roles) or 'Squad'}, Health: {row['health_status']})\n"
+    return response.strip()
+
+# ------------------------------------------------------------------------------
+# Benchmark against the greedy heuristic: python xi_solver.py [pool size]
+# ------------------------------------------------------------------------------
+def greedy_xi(df, rules):
+    # The notebook's select_playing_xi: top 6 batters, top 4 bowlers, then one
+    # all-rounder, ignoring fitness, keepers and overseas players.
+    batting, bowling = composite_scores(df, rules)
+    scored = df.assign(batting_score=batting, bowling_score=bowling)
+    batsmen = scored.nlargest(6, 'batting_score')
+    rest = scored.drop(batsmen.index)
+    bowlers = rest.nlargest(4, 'bowling_score')
+    rest = rest.drop(bowlers.index)
+    all_rounder = rest.nlargest(1, ['batting_score', 'bowling_score'])
+    return pd.concat([batsmen, bowlers, all_rounder])
+
+def _synthetic_pool(n, seed=42):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'player': [f"Player {i}" for i in range(n)],
+        'runs': rng.integers(0, 3000, n),
+        'ave': rng.uniform(5, 60, n).round(2),
+        'sr': rng.uniform(40, 140, n).round(2),
+        'wickets': rng.integers(0, 150, n),
+        'economy': rng.uniform(2, 8, n).round(2),
+        'health_status': rng.choice(['Fully Fit', 'Minor Injury', 'Niggling Injury', 'Recovering'], n),
+        'overseas': rng.random(n) < 0.3,
+    })
+
+if __name__ == '__main__':
+    import sys
+    from playing_xi import load_config
+
+    rules = load_config()['optimizer']
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    pool = add_features(_synthetic_pool(n))
+    rules = dict(rules, keepers=pool['player'].sample(frac=0.03, random_state=1).tolist())
+
+    start = time.perf_counter()
+    greedy = greedy_xi(pool, rules)
+    greedy_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    optimal = solve_xi(pool, rules)
+    solver_ms = (time.perf_counter() - start) * 1000
+
+    batting, bowling = composite_scores(pool, rules)
+    score = pd.Series(batting + bowling, index=pool.index)
+    injured = greedy['health_status'].isin(rules['excluded_health']).sum()
+    keepers = greedy['player'].isin(rules['keepers']).sum()
+    overseas = greedy['overseas'].sum()
+    print(f"pool of {n} players")
+    print(f"greedy: {greedy_ms:7.1f} ms, score {score[greedy.index].sum():.2f}, "
+          f"{injured} injured, {keepers} keepers, {overseas} overseas")
+    print(f"solver: {solver_ms:7.1f} ms, score {optimal['score'].sum():.2f}, "
+          f"0 injured, {optimal['keeper'].sum()} keepers, {optimal['overseas'].sum()} overseas")